@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import heapq
+from itertools import count, islice
+from typing import Dict, Generic, Iterator, List, Optional, Set, Tuple, TypeVar
+
+import numpy as np
+from immutables import Map
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_rankings import CondorcetRankings
+from ranking.condorcet.condorcet_utils import packed_cyclic_triangles
+from util.dtypes.bitmask import iter_bits
+
+T = TypeVar("T")
+
+# Largest n such that the states fit in an int64.
+_MAX_ITEMS = 62
+
+
+@dc.dataclass(frozen=True)
+class CondorcetAStar(Generic[T]):
+    """
+    Exact Kemeny solver by A* search over the subset lattice.
+
+    A state is the set of items placed at the front of the ranking so far, encoded as
+    an int bitmask. Placing item v next costs its violations against all items that
+    are not yet placed. The remaining cost is bounded from below by a fixed set of
+    edge-disjoint cyclic triangles of the majority tournament: every ranking of the
+    unplaced items pays at least the weakest margin of each triangle among them.
+    Placing v drops the triangles through v from the bound, and pays at least their
+    weights on the pairs of v, so the bound is consistent. States are explored in
+    order of the cost of their best possible completion, and only states that could
+    still lie on an optimal ranking are ever visited. For matrices that are nearly
+    transitive this is a small fraction of the `2**n` states of `CondorcetOptimum`.
+
+    The search keeps every cheapest way into each visited state, so all optimal
+    rankings can be enumerated. To construct, use the `of()` factory classmethod.
+    """
+
+    items: Tuple[T, ...]
+    cost: float
+    _predecessors: Map[int, Tuple[Tuple[int, int], ...]]
+
+    @property
+    def num_explored(self) -> int:
+        """
+        Number of states of the subset lattice reached by the search.
+        """
+        return len(self._predecessors)
+
+    def optimal_cost(self) -> float:
+        """
+        Return the minimal cost of a ranking of all items.
+        """
+        return self.cost
+
+    def rankings(self, max_num: Optional[int] = None) -> CondorcetRankings[T]:
+        """
+        Return the optimal rankings. If `max_num` is given, return at most that many,
+        and flag the result as truncated if there are more.
+        """
+        permutations = self._rankings()
+        if max_num is not None:
+            rankings = list(islice(permutations, max_num + 1))
+            truncated = len(rankings) > max_num
+            rankings = rankings[:max_num]
+        else:
+            rankings = list(permutations)
+            truncated = False
+        return CondorcetRankings[T].of(self.cost, rankings, truncated)
+
+    def _rankings(self) -> Iterator[Tuple[T, ...]]:
+        # Walk the cheapest predecessors back from the full state to the empty state.
+        stack: List[Tuple[int, Tuple[T, ...]]] = [((1 << len(self.items)) - 1, ())]
+        while stack:
+            placed, suffix = stack.pop()
+            if placed == 0:
+                yield suffix
+                continue
+            for prev, bit in reversed(self._predecessors[placed]):
+                stack.append((prev, (self.items[bit],) + suffix))
+
+    @classmethod
+    def of(cls, matrix: CondorcetMatrix[T]) -> CondorcetAStar[T]:
+        if len(matrix) > _MAX_ITEMS:
+            raise ValueError(f"at most {_MAX_ITEMS} items are supported")
+        search = _Search(matrix.mx)
+        search.run()
+        return cls(
+            matrix.items,
+            search.costs[search.full],
+            Map({state: tuple(preds) for state, preds in search.predecessors.items()}),
+        )
+
+
+class _Search:
+    # Mutable state of one A* run. costs holds the cheapest known cost of each state,
+    # bounds its lower bound on the remaining cost, and predecessors every (state,
+    # bit) that reaches it at that cost.
+
+    def __init__(self, mx: np.ndarray):
+        self.violation_mx = np.maximum(0, -mx)
+        self.triangles, self.weights = packed_cyclic_triangles(mx)
+        self.exact = self.violation_mx.dtype.kind in "iu"
+        self.full = (1 << len(mx)) - 1
+        self.costs: Dict[int, float] = {0: self.violation_mx.dtype.type(0).item()}
+        self.bounds: Dict[int, float] = {0: self.weights.sum().item()}
+        self.predecessors: Dict[int, List[Tuple[int, int]]] = {0: []}
+        self.closed: Set[int] = set()
+        self._bits = np.arange(len(mx), dtype=np.int64)
+        self._seq = count()
+        self._queue: List[Tuple[float, int, int, float, int]] = []
+
+    def run(self) -> None:
+        self._push(0)
+        optimum: Optional[float] = None
+        while self._queue:
+            f, _, _, cost, placed = heapq.heappop(self._queue)
+            if optimum is not None and f > optimum and not self._tied(f, optimum):
+                break
+            if placed in self.closed or cost != self.costs[placed]:
+                continue
+            self.closed.add(placed)
+            if placed == self.full:
+                optimum = cost
+            else:
+                self._expand(placed)
+
+    def _expand(self, placed: int) -> None:
+        unplaced = ((np.int64(self.full ^ placed) >> self._bits) & 1).astype(bool)
+        step_costs = self.violation_mx @ unplaced
+        # The bound drops the triangles through the placed item that were unplaced.
+        alive = unplaced[self.triangles].all(axis=1)
+        reliefs = np.zeros(len(unplaced), dtype=self.weights.dtype)
+        np.add.at(
+            reliefs, self.triangles[alive].ravel(), np.repeat(self.weights[alive], 3)
+        )
+        for bit in iter_bits(self.full ^ placed):
+            child = placed | (1 << bit)
+            cost = self.costs[placed] + step_costs[bit].item()
+            known = self.costs.get(child)
+            if known is None or (cost < known and not self._tied(cost, known)):
+                self.costs[child] = cost
+                self.bounds[child] = self.bounds[placed] - reliefs[bit].item()
+                self.predecessors[child] = [(placed, bit)]
+                self._push(child)
+            elif self._tied(cost, known):
+                self.predecessors[child].append((placed, bit))
+
+    def _push(self, state: int) -> None:
+        # Ties on the estimate go to the deeper state, which is closer to a ranking.
+        cost = self.costs[state]
+        entry = (cost + self.bounds[state], -state.bit_count(), next(self._seq))
+        heapq.heappush(self._queue, entry + (cost, state))
+
+    def _tied(self, lhs: float, rhs: float) -> bool:
+        return lhs == rhs if self.exact else bool(np.isclose(lhs, rhs))
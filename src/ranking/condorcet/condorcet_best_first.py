@@ -0,0 +1,96 @@
+"""
+Best-first enumeration of all permutations of the items of a Condorcet matrix, in
+non-decreasing order of their cost.
+
+Permutations are built front to back. A partial permutation is scored by the cost of
+its placed items, including their penalties against the unplaced items, plus the
+optimal cost of arranging the unplaced items. That optimal cost is an exact lower
+bound, so partial permutations are expanded in the order of the cost of their best
+completion, and complete permutations come out in non-decreasing cost.
+
+Expansion is lazy: the children of a partial permutation are sorted once, and each
+child only enters the queue after its preceding sibling has been popped. Every pop
+pushes at most two entries.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import heapq
+from itertools import count
+from typing import Iterator, List, Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
+from util.dtypes.bitmask import iter_bits
+
+T = TypeVar("T")
+
+
+def best_first_permutations(
+    costs: CondorcetSubsetCosts[T],
+) -> Iterator[Tuple[float, Tuple[int, ...]]]:
+    """
+    Iterator over the pairs (cost, permutation) of all permutations of the item
+    indices, in non-decreasing order of cost.
+    """
+    full_mask = (1 << costs.num_items) - 1
+    if full_mask == 0:
+        yield costs.optimal_cost(0), ()
+        return
+
+    seq = count()
+    queue: List[Tuple[float, int, _Expansion, int]] = []
+    root = _Expansion.of(costs, (), full_mask, costs.optimal_cost(0))
+    heapq.heappush(queue, (root.bounds[0], next(seq), root, 0))
+    while queue:
+        _, _, expansion, idx = heapq.heappop(queue)
+        if idx + 1 < len(expansion.bits):
+            heapq.heappush(
+                queue, (expansion.bounds[idx + 1], next(seq), expansion, idx + 1)
+            )
+        prefix, mask, cost = expansion.child(idx)
+        if mask == 0:
+            yield cost, prefix
+        else:
+            child = _Expansion.of(costs, prefix, mask, cost)
+            heapq.heappush(queue, (child.bounds[0], next(seq), child, 0))
+
+
+@dc.dataclass(frozen=True)
+class _Expansion:
+    # The children of a partial permutation, sorted by the cost of their best
+    # completion. Child i places bits[i] next, at placed cost costs[i].
+    prefix: Tuple[int, ...]
+    mask: int
+    bits: Tuple[int, ...]
+    costs: Tuple[float, ...]
+    bounds: Tuple[float, ...]
+
+    def child(self, idx: int) -> Tuple[Tuple[int, ...], int, float]:
+        bit = self.bits[idx]
+        return self.prefix + (bit,), self.mask ^ (1 << bit), self.costs[idx]
+
+    @classmethod
+    def of(
+        cls,
+        costs: CondorcetSubsetCosts[T],
+        prefix: Tuple[int, ...],
+        mask: int,
+        cost: float,
+    ) -> _Expansion:
+        bits = list(iter_bits(mask))
+        placed = [cost + costs.incremental_cost(bit, mask ^ (1 << bit)) for bit in bits]
+        bounds = [
+            placed_cost + costs.optimal_cost(mask ^ (1 << bit))
+            for bit, placed_cost in zip(bits, placed)
+        ]
+        order = np.argsort(bounds, kind="stable")
+        return cls(
+            prefix,
+            mask,
+            tuple(bits[i] for i in order),
+            tuple(placed[i] for i in order),
+            tuple(bounds[i] for i in order),
+        )
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import dataclasses as dc
+import time
+from typing import Dict, Generic, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_rankings import CondorcetRankings
+from ranking.condorcet.condorcet_utils import order_cost, packed_cyclic_triangles
+
+T = TypeVar("T")
+
+
+@dc.dataclass(frozen=True)
+class CondorcetBranchAndBound(Generic[T]):
+    """
+    Kemeny rankings found by a depth-first branch-and-bound search.
+
+    The search builds rankings front to back, one item at a time, and needs memory
+    linear in the number of items. This makes it usable above the roughly 24 items
+    at which the `2**n` tables of `CondorcetOptimum` run out of memory. The cost of
+    the unplaced items is bounded from below by a fixed set of edge-disjoint cyclic
+    triangles of the majority tournament: every ranking pays at least the weakest
+    margin of each triangle that is still unplaced. The upper bound starts from the
+    Borda ordering.
+
+    If the search is cut short by its node or time budget, `rankings` holds the best
+    rankings found so far and `lower_bound` a proven bound on the optimal cost. To
+    construct, use the `of()` factory classmethod.
+    """
+
+    rankings: CondorcetRankings[T]
+    lower_bound: float
+    is_optimal: bool
+    num_nodes: int
+
+    @property
+    def gap(self) -> float:
+        """
+        The difference between the cost of the best rankings found and the lower bound.
+        """
+        return self.rankings.cost - self.lower_bound
+
+    @classmethod
+    def of(
+        cls,
+        matrix: CondorcetMatrix[T],
+        max_num: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        time_limit: Optional[float] = None,
+    ) -> CondorcetBranchAndBound[T]:
+        """
+        Search for the optimal rankings of the matrix. Keep at most `max_num` rankings
+        of the best cost, and stop after `max_nodes` search nodes or `time_limit`
+        seconds, whichever comes first.
+        """
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        search = _Search(matrix.mx, max_num, max_nodes, deadline)
+        search.run()
+        rankings = CondorcetRankings[T].of(
+            search.best_cost,
+            [[matrix.items[idx] for idx in ranking] for ranking in search.best],
+            search.is_truncated or search.is_interrupted,
+        )
+        lower_bound = search.best_cost
+        if search.is_interrupted and not search.is_pruned(search.open_bound):
+            lower_bound = min(lower_bound, search.open_bound)
+        return cls(
+            rankings,
+            lower_bound,
+            not search.is_interrupted or lower_bound == search.best_cost,
+            search.num_nodes,
+        )
+
+
+class _Search:
+    # Mutable state of one search. With R the unplaced items, step_costs[v] is the
+    # cost of placing v ahead of R, triangle_bound sums the weights of the packed
+    # triangles inside R and triangle_losses[v] those of them that contain v.
+
+    def __init__(
+        self,
+        mx: np.ndarray,
+        max_num: Optional[int],
+        max_nodes: Optional[int],
+        deadline: Optional[float],
+    ):
+        self.violation_mx = np.maximum(0, -mx)
+        self.exact = self.violation_mx.dtype.kind in "iu"
+        self.max_num = max_num
+        self.max_nodes = max_nodes
+        self.deadline = deadline
+
+        num_items = len(mx)
+        self.unplaced = np.ones(num_items, dtype=bool)
+        self.prefix: List[int] = []
+        self.step_costs = self.violation_mx.sum(axis=1)
+
+        self.triangles, self.weights = packed_cyclic_triangles(mx)
+        self.incident = [
+            np.flatnonzero((self.triangles == item).any(axis=1))
+            for item in range(num_items)
+        ]
+        self.num_placed = np.zeros(len(self.triangles), dtype=int)
+        self.triangle_losses = np.zeros(num_items, dtype=self.weights.dtype)
+        np.add.at(
+            self.triangle_losses, self.triangles.ravel(), np.repeat(self.weights, 3)
+        )
+        self.triangle_bound = self.weights.sum().item()
+
+        order = np.argsort(-mx.sum(axis=1), kind="stable")
+        self.best_cost = order_cost(order, self.violation_mx)
+        self.best: Dict[Tuple[int, ...], None] = {tuple(order.tolist()): None}
+        self.open_bound = float("inf")
+        self.num_nodes = 0
+        self.is_truncated = False
+        self.is_interrupted = False
+
+    def run(self) -> None:
+        self._descend(0)
+
+    def is_pruned(self, bound: float) -> bool:
+        return bound > self.best_cost and not self._tied(bound, self.best_cost)
+
+    def _descend(self, cost: float) -> None:
+        self.num_nodes += 1
+        if len(self.prefix) == len(self.unplaced):
+            self._record(cost)
+            return
+        candidates = np.flatnonzero(self.unplaced)
+        bounds = (
+            cost
+            + self.step_costs[candidates]
+            + (self.triangle_bound - self.triangle_losses[candidates])
+        )
+        for idx in np.argsort(bounds, kind="stable"):
+            bound = bounds[idx].item()
+            if self.is_interrupted or self._out_of_budget():
+                # The remaining children are sorted, so this one has the least bound.
+                self.is_interrupted = True
+                self.open_bound = min(self.open_bound, bound)
+                return
+            if self.is_pruned(bound):
+                return
+            if self._is_full() and self._tied(bound, self.best_cost):
+                self.is_truncated = True
+                return
+            item = candidates[idx].item()
+            step_cost = self.step_costs[item].item()
+            self._place(item)
+            self._descend(cost + step_cost)
+            self._unplace(item)
+
+    def _record(self, cost: float) -> None:
+        ranking = tuple(self.prefix)
+        if self.is_pruned(cost) or ranking in self.best:
+            return
+        if not self._tied(cost, self.best_cost):
+            self.best_cost = cost
+            self.best = {}
+            self.is_truncated = False
+        if self._is_full():
+            self.is_truncated = True
+        else:
+            self.best[ranking] = None
+
+    def _place(self, item: int) -> None:
+        self.unplaced[item] = False
+        self.prefix.append(item)
+        self.step_costs -= self.violation_mx[:, item]
+        triangles = self.incident[item]
+        self._update_triangles(triangles[self.num_placed[triangles] == 0], -1)
+        self.num_placed[triangles] += 1
+
+    def _unplace(self, item: int) -> None:
+        triangles = self.incident[item]
+        self.num_placed[triangles] -= 1
+        self._update_triangles(triangles[self.num_placed[triangles] == 0], 1)
+        self.step_costs += self.violation_mx[:, item]
+        self.prefix.pop()
+        self.unplaced[item] = True
+
+    def _update_triangles(self, triangles: np.ndarray, sign: int) -> None:
+        weights = sign * self.weights[triangles]
+        self.triangle_bound += weights.sum().item()
+        items = self.triangles[triangles].ravel()
+        np.add.at(self.triangle_losses, items, np.repeat(weights, 3))
+
+    def _is_full(self) -> bool:
+        return self.max_num is not None and len(self.best) >= self.max_num
+
+    def _out_of_budget(self) -> bool:
+        if self.max_nodes is not None and self.num_nodes > self.max_nodes:
+            return True
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def _tied(self, lhs: float, rhs: float) -> bool:
+        return lhs == rhs if self.exact else bool(np.isclose(lhs, rhs))
+
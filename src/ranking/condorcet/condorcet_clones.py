@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from itertools import islice, product
+from typing import Dict, Generic, Iterator, List, Optional, Self, Tuple, TypeVar, Union
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import LayerMinimum, count_dtype
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_rankings import CondorcetRankings
+
+T = TypeVar("T")
+
+def clone_groups(matrix: CondorcetMatrix[T]) -> Tuple[Tuple[T, ...], ...]:
+    """
+    Return the groups of clones of the matrix, in the order of their first item.
+
+    Two items are clones if their rows agree on every other item. Chains of clones
+    form a group: every item outside a group stands in the same relation to all of its
+    members. Items without a clone form a group of their own.
+    """
+    mx = matrix.mx
+    num_items = len(matrix)
+    # same[a, b, x] iff rows a and b agree on x; the entries of a and b are ignored.
+    same = mx[:, np.newaxis, :] == mx[np.newaxis, :, :]
+    idxs = np.arange(num_items)
+    same[idxs, :, idxs] = True
+    same[:, idxs, idxs] = True
+    lhs_idxs, rhs_idxs = np.nonzero(np.triu(same.all(axis=2), 1))
+
+    roots = list(range(num_items))
+    for lhs, rhs in zip(lhs_idxs.tolist(), rhs_idxs.tolist()):
+        lhs_root, rhs_root = _root(roots, lhs), _root(roots, rhs)
+        roots[max(lhs_root, rhs_root)] = min(lhs_root, rhs_root)
+    groups: Dict[int, List[T]] = {}
+    for idx, item in enumerate(matrix.items):
+        groups.setdefault(_root(roots, idx), []).append(item)
+    return tuple(tuple(group) for group in groups.values())
+
+
+@dc.dataclass(frozen=True)
+class CondorcetClones(Generic[T]):
+    """
+    Optimal rankings of a Condorcet matrix, solved with its clone groups collapsed.
+
+    The members of a clone group are interchangeable towards all other items. A
+    ranking therefore splits into a sequence of group tokens, in which a group of size
+    m occurs m times, and an arrangement of each group over its own tokens. Both parts
+    are optimised independently. The token sequences are solved by the subset DP over
+    mixed-radix states, holding how many tokens of each group remain, so a group of m
+    clones costs a factor m + 1 rather than 2**m. The states are solved one layer of
+    remaining tokens at a time. If no item has a clone, the sequences are plain
+    rankings, and the `CondorcetOptimum` of the matrix is used instead. The
+    arrangements of each group come from a `CondorcetOptimum` of the group alone.
+
+    Every optimal ranking of the matrix is an optimal token sequence combined with an
+    optimal arrangement of each group, so the rankings and counts are exact. To
+    construct, use the `of()` factory classmethod.
+    """
+
+    groups: Tuple[Tuple[T, ...], ...]
+    group_optima: Tuple[CondorcetOptimum[T], ...]
+    _sequences: Union[_TokenSequences, _SubsetSequences]
+
+    def optimal_cost(self) -> float:
+        """
+        Return the minimal cost of a ranking of all items.
+        """
+        internal = sum(optimum.costs.optimal_cost() for optimum in self.group_optima)
+        return self._sequences.optimal_cost() + internal
+
+    def num_rankings(self) -> int:
+        """
+        Return the number of optimal rankings, without enumerating them.
+        """
+        total = self._sequences.num_sequences()
+        for optimum in self.group_optima:
+            total *= optimum.num_rankings()
+        return total
+
+    def rankings(self, max_num: Optional[int] = None) -> CondorcetRankings[T]:
+        """
+        Return the optimal rankings. If `max_num` is given, return at most that many,
+        and flag the result as truncated if there are more.
+        """
+        permutations = self._rankings()
+        if max_num is not None:
+            rankings = list(islice(permutations, max_num + 1))
+            truncated = len(rankings) > max_num
+            rankings = rankings[:max_num]
+        else:
+            rankings = list(permutations)
+            truncated = False
+        return CondorcetRankings[T].of(self.optimal_cost(), rankings, truncated)
+
+    def _rankings(self) -> Iterator[Tuple[T, ...]]:
+        arrangements = [
+            [ranking.items for ranking in optimum.rankings()]
+            for optimum in self.group_optima
+        ]
+        for sequence in self._sequences.optimal_sequences():
+            for arrangement in product(*arrangements):
+                members = [iter(group) for group in arrangement]
+                yield tuple(next(members[group]) for group in sequence)
+
+    @classmethod
+    def of(cls, matrix: CondorcetMatrix[T]) -> Self:
+        groups = clone_groups(matrix)
+        group_matrix = CondorcetMatrix[int](
+            tuple(range(len(groups))),
+            matrix.select(group[0] for group in groups).frozen_arr,
+        )
+        sequences: Union[_TokenSequences, _SubsetSequences]
+        if all(len(group) == 1 for group in groups):
+            sequences = _SubsetSequences(CondorcetOptimum[int].of(group_matrix))
+        else:
+            sequences = _TokenSequences.of(
+                group_matrix.violation_mx, np.array([len(group) for group in groups])
+            )
+        group_optima = tuple(
+            CondorcetOptimum[T].of(matrix.select(group)) for group in groups
+        )
+        return cls(groups, group_optima, sequences)
+
+
+@dc.dataclass(frozen=True)
+class _TokenSequences:
+    # Subset DP over the multisets of remaining tokens. A state holds digit k remaining
+    # tokens of group k, and is indexed by the sum over k of digit k times strides[k].
+    strides: np.ndarray
+    costs: np.ndarray
+    tight_groups: np.ndarray
+    counts: np.ndarray
+
+    def optimal_cost(self) -> float:
+        return self.costs[-1].item()
+
+    def num_sequences(self) -> int:
+        return int(self.counts[-1])
+
+    def optimal_sequences(self) -> Iterator[Tuple[int, ...]]:
+        # Depth-first walk over the tight groups, from the full state down to the
+        # empty one, as in CondorcetOptimum.
+        state = len(self.costs) - 1
+        sequence: List[int] = []
+        pending = [int(self.tight_groups[state])]
+        while True:
+            if state == 0:
+                yield tuple(sequence)
+            while pending and pending[-1] == 0:
+                pending.pop()
+                if sequence:
+                    state += int(self.strides[sequence.pop()])
+            if not pending:
+                return
+            lowest = pending[-1] & -pending[-1]
+            pending[-1] ^= lowest
+            group = lowest.bit_length() - 1
+            sequence.append(group)
+            state -= int(self.strides[group])
+            pending.append(int(self.tight_groups[state]))
+
+    @classmethod
+    def of(cls, violation_mx: np.ndarray, sizes: np.ndarray) -> Self:
+        strides = np.cumprod(np.concatenate([[1], sizes + 1]))[:-1].astype(np.int64)
+        num_states = int(np.prod(sizes + 1))
+        cost_dtype = np.result_type(violation_mx.dtype, np.int64)
+        costs = np.zeros(num_states, dtype=cost_dtype)
+        tight_groups = np.zeros(num_states, dtype=np.int64)
+        counts = np.zeros(num_states, dtype=count_dtype(sizes.sum()))
+        counts[0] = 1
+        # The states are walked one layer of remaining tokens at a time, each layer
+        # found from the one below, so that the digits are never held for all states.
+        layer = np.zeros(1, dtype=np.int64)
+        for _ in range(sizes.sum()):
+            below_digits = _digits(layer, strides, sizes)
+            layer = np.unique(
+                np.concatenate(
+                    [
+                        layer[below_digits[:, group] < size] + strides[group]
+                        for group, size in enumerate(sizes)
+                    ]
+                )
+            )
+            digits = _digits(layer, strides, sizes)
+            # Placing a token of group k ahead of the remaining tokens; tokens of the
+            # same group cost nothing against each other.
+            incremental_costs = digits @ violation_mx.T
+            minimum = LayerMinimum.of(len(layer), cost_dtype, np.int64, counts.dtype)
+            for group in range(len(sizes)):
+                idxs = np.flatnonzero(digits[:, group] > 0)
+                prev = layer[idxs] - strides[group]
+                cost = costs[prev] + incremental_costs[idxs, group]
+                minimum.relax(idxs, cost, 1 << group, counts[prev])
+            costs[layer] = minimum.best
+            tight_groups[layer] = minimum.tight
+            counts[layer] = minimum.counts
+        return cls(strides, costs, tight_groups, counts)
+
+
+@dc.dataclass(frozen=True)
+class _SubsetSequences:
+    # Without clones, every group has a single token, and the token sequences are the
+    # optimal rankings of the groups, as solved by the plain subset DP.
+    optimum: CondorcetOptimum[int]
+
+    def optimal_cost(self) -> float:
+        return self.optimum.costs.optimal_cost()
+
+    def num_sequences(self) -> int:
+        return self.optimum.num_rankings()
+
+    def optimal_sequences(self) -> Iterator[Tuple[int, ...]]:
+        for k in range(self.num_sequences()):
+            yield self.optimum.kth_ranking(k).items
+
+
+def _digits(states: np.ndarray, strides: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    # Remaining tokens per group of each state, as a (states, groups) array.
+    return (states[:, np.newaxis] // strides) % (sizes + 1)
+
+
+def _root(roots: List[int], idx: int) -> int:
+    while roots[idx] != idx:
+        roots[idx] = roots[roots[idx]]
+        idx = roots[idx]
+    return idx
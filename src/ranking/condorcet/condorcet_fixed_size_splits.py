@@ -0,0 +1,96 @@
+"""
+Optimal splits of one head size, without the subset tables of `CondorcetSubsetCosts`.
+
+The `comb(n, k)` tails of the requested size are walked in ascending order, the order
+of Gosper's hack, in chunks unranked from the combinatorial number system. The split
+cost of a tail is the sum, over its items, of the violations of the head items ahead
+of that item. Those sums over the head are read from a byte-wise lookup of the columns
+of the violation matrix, one vectorized query per item and chunk. Memory is that of
+one chunk, rather than `O(2**n)`.
+
+Items pinned to the head or the tail are taken out of the walk: the combinations run
+over the free items only, and are deposited onto their bit positions before the tail
+pins are added. Masks that break the pins are never materialised.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+)
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_splits import CondorcetSplits
+from ranking.condorcet.condorcet_utils import pinned_split_masks
+from util.dtypes.bitmask import binomials, combinations_of, deposit_bits, iter_bits
+
+T = TypeVar("T")
+
+# Number of tails evaluated per vectorized chunk.
+_CHUNK_SIZE = 1 << 16
+
+
+def fixed_size_splits(
+    matrix: CondorcetMatrix[T],
+    head_size: int,
+    chunk_size: int = _CHUNK_SIZE,
+    must_head: Iterable[T] = (),
+    must_tail: Iterable[T] = (),
+) -> CondorcetSplits[T]:
+    """
+    The optimal splits of the matrix with a head of `head_size` items, and with the
+    items of `must_head` and `must_tail` pinned to the head and the tail. These are
+    the same as `CondorcetOptimum.splits(head_size, must_head, must_tail)`.
+    """
+    num_items = len(matrix)
+    if not 0 <= head_size <= num_items:
+        raise ValueError(f"head size {head_size} out of range for {num_items}")
+    head_mask, tail_mask = pinned_split_masks(matrix.items, must_head, must_tail)
+    free_bits = [
+        bit for bit in range(num_items) if not ((head_mask | tail_mask) >> bit) & 1
+    ]
+    num_free = len(free_bits)
+    free_tail_size = num_items - head_size - tail_mask.bit_count()
+    if not 0 <= free_tail_size <= num_free:
+        raise ValueError(f"pinned items do not fit a head of {head_size} items")
+    # Row i of the transpose holds the violations of every item ahead of item i.
+    lookup = CondorcetIncrementalCostLookup.of(matrix.violation_mx.T)
+    full_mask = (1 << num_items) - 1
+
+    best_cost = None
+    best_tails: List[np.ndarray] = []
+    num_tails = int(binomials(num_free)[num_free, free_tail_size])
+    for start in range(0, num_tails, max(chunk_size, 1)):
+        free_tails = combinations_of(
+            num_free, free_tail_size, start, start + chunk_size
+        )
+        tails = deposit_bits(free_tails, free_bits) | tail_mask
+        costs = _split_costs(tails, full_mask ^ tails, lookup, num_items)
+        min_cost = costs.min()
+        if best_cost is None or min_cost < best_cost:
+            best_cost, best_tails = min_cost, []
+        if min_cost == best_cost:
+            best_tails.append(tails[costs == min_cost])
+
+    tail_masks = np.concatenate(best_tails).tolist()
+    return CondorcetSplits[T].of_tails(
+        cost=best_cost.item(),
+        tails=([matrix.items[idx] for idx in iter_bits(mask)] for mask in tail_masks),
+        items=matrix.items,
+    )
+
+
+def _split_costs(
+    tails: np.ndarray,
+    heads: np.ndarray,
+    lookup: CondorcetIncrementalCostLookup,
+    num_items: int,
+) -> np.ndarray:
+    costs = np.zeros(len(tails), dtype=np.result_type(lookup.dtype, np.int64))
+    for item in range(num_items):
+        idxs = np.flatnonzero((tails >> item) & 1)
+        costs[idxs] += lookup.costs(item, heads[idxs])
+    return costs
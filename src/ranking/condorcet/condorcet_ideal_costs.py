@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Generic, Iterable, List, Self, Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+    LayerMinimum,
+    count_dtype,
+)
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_utils import dominance_precedences
+from util.dtypes.bitmask import iter_bits
+
+T = TypeVar("T")
+
+# Largest n such that the masks fit in an int64.
+_MAX_ITEMS = 62
+
+
+@dc.dataclass(frozen=True)
+class CondorcetIdealCosts(Generic[T]):
+    """
+    Optimal cost structure of a Condorcet matrix, for the rankings that respect a set
+    of precedence constraints "i precedes j".
+
+    This is the counterpart of `CondorcetSubsetCosts` that only visits the masks
+    which can remain to be arranged after some prefix of such a ranking: the masks
+    that contain every successor of each of their items. These are the order ideals
+    of the reversed precedence order, and there are often orders of magnitude fewer of
+    them than `2**n`. The masks are kept per popcount layer, sorted, and looked up by
+    binary search.
+
+    The queries mirror those of `CondorcetSubsetCosts`, and take a `KeyError` for a
+    mask that is not an ideal. To construct, use the `of()` factory classmethod.
+    """
+
+    items: Tuple[T, ...]
+    predecessors: Tuple[int, ...]
+    _layers: Tuple[_IdealLayer, ...]
+    _incremental_costs: CondorcetIncrementalCostLookup
+
+    @property
+    def num_items(self) -> int:
+        return len(self.items)
+
+    @property
+    def num_ideals(self) -> int:
+        """
+        Return the number of masks in the lattice.
+        """
+        return sum(len(layer.masks) for layer in self._layers)
+
+    @property
+    def is_integral(self) -> bool:
+        """
+        True iff the costs are exact integers.
+        """
+        return self._incremental_costs.dtype.kind in "iu"
+
+    def incremental_cost(self, bit: int, mask: int) -> float:
+        """
+        Return the penalty cost of arranging the item represented by the bit before the
+        items represented by the bitmask.
+        """
+        return self._incremental_costs.costs(bit, np.asarray(mask)).item()
+
+    def optimal_cost(self, mask: int = -1) -> float:
+        """
+        Return the minimal cost paid to arrange the items represented by the bitmask,
+        subject to the precedences.
+        """
+        layer, idx = self._locate(mask)
+        return layer.costs[idx].item()
+
+    def is_tight(self, bit: int, mask: int) -> bool:
+        """
+        Return True iff arranging the item represented by the bit ahead of the other
+        items of the bitmask is part of an optimal arrangement of the bitmask.
+        """
+        return bool((self.tight_bits(mask) >> bit) & 1)
+
+    def tight_bits(self, mask: int) -> int:
+        """
+        Return the bitmask of the items that can be arranged first in an optimal
+        arrangement of the items represented by the bitmask.
+        """
+        layer, idx = self._locate(mask)
+        return int(layer.tight_bits[idx])
+
+    def num_optimal_arrangements(self, mask: int = -1) -> int:
+        """
+        Return the number of distinct optimal arrangements of the items represented by
+        the bitmask.
+        """
+        layer, idx = self._locate(mask)
+        return int(layer.counts[idx])
+
+    def mask_to_items(self, mask: int) -> Tuple[T, ...]:
+        """
+        Convert the bitmask to a tuple of the items that it represents.
+        """
+        return tuple(self.items[idx] for idx in iter_bits(mask))
+
+    def _locate(self, mask: int) -> Tuple[_IdealLayer, int]:
+        mask &= (1 << self.num_items) - 1
+        layer = self._layers[mask.bit_count()]
+        idx = int(np.searchsorted(layer.masks, mask))
+        if idx == len(layer.masks) or layer.masks[idx] != mask:
+            raise KeyError(f"mask {mask} is not closed under the precedences")
+        return layer, idx
+
+    @classmethod
+    def of(
+        cls,
+        condorcet_matrix: CondorcetMatrix[T],
+        precedences: Iterable[Tuple[T, T]] = (),
+        derive_precedences: bool = True,
+    ) -> Self:
+        """
+        Construct the costs of the rankings in which, for every pair `(lhs, rhs)` of
+        `precedences`, `lhs` precedes `rhs`. Raise a `ValueError` if the precedences
+        are cyclic or name unknown items.
+
+        If `derive_precedences`, add the `dominance_precedences` of the matrix that
+        hold in every optimal ranking. These are only sound for pairs whose items do
+        not take part in a user precedence, and others are skipped.
+        """
+        items = condorcet_matrix.items
+        if len(items) > _MAX_ITEMS:
+            raise ValueError(f"at most {_MAX_ITEMS} items are supported")
+        item_to_idx = {item: idx for idx, item in enumerate(items)}
+        pairs = list(precedences)
+        unknown = {item for pair in pairs for item in pair} - item_to_idx.keys()
+        if unknown:
+            names = sorted(map(str, unknown))
+            raise ValueError(f"unknown items in precedences: {names}")
+        if derive_precedences:
+            pinned = {item for pair in pairs for item in pair}
+            pairs.extend(
+                (lhs, rhs)
+                for lhs, rhs in dominance_precedences(condorcet_matrix)
+                if lhs not in pinned and rhs not in pinned
+            )
+        predecessors = [0] * len(items)
+        for lhs, rhs in pairs:
+            predecessors[item_to_idx[rhs]] |= 1 << item_to_idx[lhs]
+
+        incremental_costs = CondorcetIncrementalCostLookup.of(
+            condorcet_matrix.violation_mx
+        )
+        masks = _ideal_masks(predecessors)
+        if len(masks[0]) == 0:
+            raise ValueError("precedences are cyclic")
+        layers = _solve_layers(masks, predecessors, incremental_costs)
+        return cls(items, tuple(predecessors), layers, incremental_costs)
+
+
+@dc.dataclass(frozen=True)
+class _IdealLayer:
+    # Sorted masks of one popcount, with their optimal cost, the bitmask of the bits
+    # that attain it, and the number of optimal arrangements.
+    masks: np.ndarray
+    costs: np.ndarray
+    tight_bits: np.ndarray
+    counts: np.ndarray
+
+
+def _ideal_masks(predecessors: List[int]) -> List[np.ndarray]:
+    # Walk down from the full mask, removing an item once none of its predecessors
+    # remain. Returns the sorted masks per popcount.
+    num_items = len(predecessors)
+    layers = [np.zeros(0, dtype=np.int64)] * num_items + [
+        np.array([(1 << num_items) - 1], dtype=np.int64)
+    ]
+    for size in range(num_items, 0, -1):
+        layer = layers[size]
+        removals = [
+            layer[_removable(layer, bit, predecessors[bit])] ^ (1 << bit)
+            for bit in range(num_items)
+        ]
+        layers[size - 1] = np.unique(np.concatenate(removals))
+    return layers
+
+
+def _solve_layers(
+    masks: List[np.ndarray],
+    predecessors: List[int],
+    incremental_costs: CondorcetIncrementalCostLookup,
+) -> Tuple[_IdealLayer, ...]:
+    # Same layered DP as CondorcetSubsetCosts, except that the first item of a mask
+    # must have no predecessor left in it, and the rest of the mask is found by binary
+    # search in the layer below.
+    num_items = len(predecessors)
+    cost_dtype = np.result_type(incremental_costs.dtype, np.int64)
+    counts_dtype = count_dtype(num_items)
+    layers = [
+        _IdealLayer(
+            masks[0],
+            np.zeros(1, dtype=cost_dtype),
+            np.zeros(1, dtype=np.int64),
+            np.ones(1, dtype=counts_dtype),
+        )
+    ]
+    for layer in masks[1:]:
+        below = layers[-1]
+        minimum = LayerMinimum.of(len(layer), cost_dtype, np.int64, counts_dtype)
+        for bit in range(num_items):
+            idxs = np.flatnonzero(_removable(layer, bit, predecessors[bit]))
+            prev = layer[idxs] ^ (1 << bit)
+            prev_idxs = np.searchsorted(below.masks, prev)
+            cost = below.costs[prev_idxs] + incremental_costs.costs(bit, prev)
+            minimum.relax(idxs, cost, 1 << bit, below.counts[prev_idxs])
+        layers.append(_IdealLayer(layer, minimum.best, minimum.tight, minimum.counts))
+    return tuple(layers)
+
+
+def _removable(layer: np.ndarray, bit: int, predecessors: int) -> np.ndarray:
+    # Which masks hold the bit but none of its predecessors, so that its item can be
+    # arranged first.
+    return ((layer >> bit) & 1).astype(bool) & ((layer & predecessors) == 0)
@@ -0,0 +1,212 @@
+"""
+Backends for the incremental costs of a Condorcet matrix.
+
+The incremental cost of an item and a set of items, with the item not in the set, is
+the total violation penalty of placing the item ahead of the set. Sets are encoded as
+int bitmasks. Both backends answer vectorized queries for one item and an array of
+masks that do not contain the item.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Optional, Protocol, Self
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from util.dtypes.bitmask import drop_bit
+from util.nppd.parallel_slices import for_each_slice
+
+_BYTE = 8
+
+# Largest n such that n! fits in an int64.
+_MAX_INT64_FACTORIAL = 20
+
+
+class CondorcetIncrementalCosts(Protocol):
+    @property
+    def dtype(self) -> np.dtype: ...
+
+    def costs(self, bit: int, masks: np.ndarray) -> np.ndarray: ...
+
+
+@dc.dataclass(frozen=True)
+class CondorcetIncrementalCostTable:
+    """
+    Fully materialised incremental costs. The row of a bit only holds the masks that
+    do not contain the bit, indexed by the mask with that bit dropped, so the table
+    has shape `(n, 2**(n-1))`.
+    """
+
+    table: np.ndarray
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.table.dtype
+
+    def costs(self, bit: int, masks: np.ndarray) -> np.ndarray:
+        return self.table[bit, drop_bit(masks, bit)]
+
+    @classmethod
+    def of(cls, violation_mx: np.ndarray, workers: int = 1) -> Self:
+        """
+        Build the table from the violation matrix. The rows are independent, and are
+        built in parallel if `workers` exceeds 1.
+        """
+        n = len(violation_mx)
+        # Row i holds the violations of item i against every other item.
+        off_diagonal = violation_mx[~np.eye(n, dtype=bool)].reshape(n, max(n - 1, 0))
+        off_diagonal = off_diagonal.astype(_cost_dtype(violation_mx))
+        table = np.zeros((n, 1 << off_diagonal.shape[1]), dtype=off_diagonal.dtype)
+
+        def build_rows(rows: slice) -> None:
+            _fill_subset_row_sums(off_diagonal[rows], table[rows])
+
+        for_each_slice(build_rows, n, workers)
+        return cls(table)
+
+
+@dc.dataclass(frozen=True)
+class CondorcetIncrementalCostLookup:
+    """
+    Incremental costs computed on demand. Each row of the violation matrix is cut into
+    bytes of 8 items, and entry `[i, b, byte]` of the lookup holds the sum of row `i`
+    over the items of byte `b` that are set in `byte`. A query sums one lookup per
+    byte of the mask, so memory is `O(n**2)` rather than `O(n * 2**n)`.
+    """
+
+    lookup: np.ndarray
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self.lookup.dtype
+
+    def costs(self, bit: int, masks: np.ndarray) -> np.ndarray:
+        masks = np.asarray(masks)
+        row = self.lookup[bit]
+        total = np.zeros(masks.shape, dtype=self.dtype)
+        for byte_idx, byte_sums in enumerate(row):
+            total += byte_sums[(masks >> (_BYTE * byte_idx)) & 0xFF]
+        return total
+
+    @classmethod
+    def of(cls, violation_mx: np.ndarray) -> Self:
+        n = len(violation_mx)
+        mx = violation_mx.astype(_cost_dtype(violation_mx))
+        lookup = np.zeros((n, -(-n // _BYTE), 1 << _BYTE), dtype=mx.dtype)
+        for byte_idx in range(lookup.shape[1]):
+            chunk = mx[:, _BYTE * byte_idx : _BYTE * (byte_idx + 1)]
+            lookup[:, byte_idx, : 1 << chunk.shape[1]] = _subset_row_sums(chunk)
+        return cls(lookup)
+
+
+def unreachable_cost(dtype: np.dtype) -> float:
+    """
+    Value above any attainable cost of the given dtype, to start a running minimum.
+    """
+    return np.iinfo(dtype).max if dtype.kind in "iu" else np.inf
+
+
+def count_dtype(num_items: int) -> DTypeLike:
+    """
+    Dtype for the numbers of optimal arrangements of up to `num_items` items. These
+    fit in an int64 up to 20 items, and are kept as Python ints beyond.
+    """
+    return np.int64 if num_items <= _MAX_INT64_FACTORIAL else object
+
+
+@dc.dataclass(frozen=True)
+class LayerMinimum:
+    """
+    Running minimum over the moves into one layer of a subset DP. Each move offers a
+    cost to some states of the layer. The flags of the moves that attain the minimum
+    of a state are collected, and if `counts` are kept, the counts of the states that
+    those moves come from are summed. Integral costs are compared exactly, and float
+    costs up to `np.isclose`. To construct, use the `of()` factory classmethod.
+    """
+
+    best: np.ndarray
+    tight: np.ndarray
+    counts: Optional[np.ndarray] = None
+
+    def relax(
+        self,
+        idxs: np.ndarray,
+        costs: np.ndarray,
+        flag: int,
+        prev_counts: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Offer `costs` to the states at `idxs`, through the move with the given flag
+        bit, from states with `prev_counts` optimal arrangements.
+        """
+        current = self.best[idxs]
+        if self.best.dtype.kind in "iu":
+            tied = costs == current
+            better = costs < current
+        else:
+            tied = np.isclose(costs, current)
+            better = (costs < current) & ~tied
+        tight = self.tight[idxs]
+        flag = self.tight.dtype.type(flag)
+        self.tight[idxs] = np.where(better, flag, np.where(tied, tight | flag, tight))
+        if self.counts is not None:
+            counts = self.counts[idxs]
+            self.counts[idxs] = np.where(
+                better, prev_counts, np.where(tied, counts + prev_counts, counts)
+            )
+        self.best[idxs] = np.minimum(current, costs)
+
+    @classmethod
+    def of(
+        cls,
+        size: int,
+        cost_dtype: DTypeLike,
+        tight_dtype: DTypeLike,
+        counts_dtype: Optional[DTypeLike] = None,
+    ) -> Self:
+        """
+        Start the minimum of `size` states, none reached yet. Counts are only kept if
+        their dtype is given.
+        """
+        cost_dtype = np.dtype(cost_dtype)
+        return cls(
+            best=np.full(size, unreachable_cost(cost_dtype), dtype=cost_dtype),
+            tight=np.zeros(size, dtype=tight_dtype),
+            counts=None if counts_dtype is None else np.zeros(size, dtype=counts_dtype),
+        )
+
+
+def _cost_dtype(violation_mx: np.ndarray) -> DTypeLike:
+    # Smallest integer dtype that holds the largest incremental cost, being the largest
+    # row sum; float64 for matrices with fractional entries.
+    if not _is_integral(violation_mx):
+        return np.float64
+    max_cost = int(violation_mx.sum(axis=1).max(initial=0))
+    for dtype in (np.int16, np.int32):
+        if max_cost <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _is_integral(arr: np.ndarray) -> bool:
+    if arr.dtype.kind in "iu":
+        return True
+    return bool(np.all(np.isfinite(arr)) and np.array_equal(arr, np.round(arr)))
+
+
+def _subset_row_sums(mx: np.ndarray) -> np.ndarray:
+    sums = np.zeros((mx.shape[0], 1 << mx.shape[1]), dtype=mx.dtype)
+    _fill_subset_row_sums(mx, sums)
+    return sums
+
+
+def _fill_subset_row_sums(mx: np.ndarray, sums: np.ndarray) -> None:
+    # Entry [i, mask] is the sum of mx[i, u] over the bits u of the mask. Built by
+    # descending over the bit positions, so that every mask is filled from the mask
+    # with its lowest bit removed: the same summation order as a per-mask loop.
+    # Expects sums to be zero-initialised.
+    for bit in reversed(range(mx.shape[1])):
+        blocks = sums.reshape(mx.shape[0], -1, 2, 1 << bit)
+        blocks[:, :, 1, 0] = blocks[:, :, 0, 0] + mx[:, bit : bit + 1]
@@ -0,0 +1,77 @@
+"""
+KwikSort: randomised pivot ranking of a Condorcet matrix.
+
+A pivot is drawn uniformly from the items, the items that beat it go ahead of it and
+the others behind it, and both sides are ranked the same way. The partition is one
+vectorized read of the pivot's column. On a tournament this gives an expected
+3-approximation of the Kemeny cost, in expected `O(n log n)` matrix reads.
+
+The best of many seeded restarts is kept. The restarts are independent, and are run
+on a pool of processes if `workers` exceeds 1. Their seeds are spawned from one
+`SeedSequence`, so the result is the same for any number of workers.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_utils import order_cost
+from ranking.dtypes.costed_ranking import CostedRanking
+
+T = TypeVar("T")
+
+
+def kwik_sort_ranking(
+    matrix: CondorcetMatrix[T], num_restarts: int = 16, seed: int = 0, workers: int = 1
+) -> CostedRanking[T]:
+    """
+    The lowest-cost ranking over `num_restarts` runs of KwikSort, with its cost. Ties
+    go to the earliest restart.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(max(num_restarts, 1))
+    if workers > 1 and len(seeds) > 1:
+        chunks = [list(chunk) for chunk in np.array_split(seeds, workers) if len(chunk)]
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            results = list(executor.map(_best_of_restarts, repeat(matrix.mx), chunks))
+        order, cost = min(results, key=lambda result: result[1])
+    else:
+        order, cost = _best_of_restarts(matrix.mx, seeds)
+    return CostedRanking[T].of([matrix.items[idx] for idx in order], cost)
+
+
+def _best_of_restarts(
+    mx: np.ndarray, seeds: Sequence[np.random.SeedSequence]
+) -> Tuple[np.ndarray, float]:
+    violation_mx = np.maximum(0, -mx)
+    best_order, best_cost = np.zeros(0, dtype=int), None
+    for seed in seeds:
+        order = _kwik_sort(mx, np.random.default_rng(seed))
+        cost = order_cost(order, violation_mx)
+        if best_cost is None or cost < best_cost:
+            best_order, best_cost = order, cost
+    return best_order, best_cost
+
+
+def _kwik_sort(mx: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    # Explicit stack of item ranges, processed front to back. A pivot is emitted once
+    # everything that beats it has been.
+    order: List[int] = []
+    stack: List[np.ndarray] = [np.arange(len(mx))]
+    while stack:
+        idxs = stack.pop()
+        if len(idxs) <= 1:
+            order.extend(idxs.tolist())
+            continue
+        pos = int(rng.integers(len(idxs)))
+        pivot = idxs[pos]
+        rest = np.delete(idxs, pos)
+        ahead = mx[rest, pivot] > 0
+        stack.append(rest[~ahead])
+        stack.append(np.array([pivot]))
+        stack.append(rest[ahead])
+    return np.array(order, dtype=int)
@@ -0,0 +1,128 @@
+"""
+Layer-streaming evaluation of the optimal costs of the subsets of a Condorcet matrix.
+
+The optimal cost of a subset only depends on the optimal costs of the subsets with one
+item fewer. Evaluating the subsets one size at a time therefore only needs the previous
+layer in memory: at most `2 * comb(n, n // 2)` costs at any time, instead of `2**n`.
+
+Within a layer, subsets are bitmasks in ascending order, which is the order of their
+rank in the combinatorial number system. Layers are indexed by that rank.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Dict, Iterator
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCosts,
+    unreachable_cost,
+)
+from util.dtypes.bitmask import binomials, combination_ranks, combinations_of
+
+
+@dc.dataclass(frozen=True)
+class CondorcetLayer:
+    """
+    The optimal costs of all subsets of one size. Entry `i` of `costs` is the optimal
+    cost of arranging the items of `masks[i]`, and `i` is the combinatorial rank of
+    that mask.
+    """
+
+    num_items: int
+    size: int
+    masks: np.ndarray
+    costs: np.ndarray
+
+    def cost(self, masks: np.ndarray) -> np.ndarray:
+        """
+        Optimal costs of the masks, which must all be of the size of this layer.
+        """
+        return self.costs[combination_ranks(masks, self.num_items)]
+
+
+def stream_layers(
+    incremental_costs: CondorcetIncrementalCosts, num_items: int
+) -> Iterator[CondorcetLayer]:
+    """
+    Iterator over the layers of subset sizes 0, 1, ..., `num_items`. Each layer is
+    computed from the previous one only, so callers that do not hold on to earlier
+    layers keep two layers in memory.
+    """
+    dtype = np.result_type(incremental_costs.dtype, np.int64)
+    layer = CondorcetLayer(
+        num_items, 0, np.zeros(1, dtype=np.int64), np.zeros(1, dtype=dtype)
+    )
+    yield layer
+    for _ in range(num_items):
+        layer = _next_layer(incremental_costs, layer)
+        yield layer
+
+
+def midpoint_layer(
+    incremental_costs: CondorcetIncrementalCosts, num_items: int, head_size: int
+) -> CondorcetLayer:
+    """
+    Layer of all heads of `head_size` items. The cost of a head is the optimal cost of
+    a ranking that starts with it: the optimal cost of the head, plus the optimal cost
+    of the tail, plus the split cost of placing the head ahead of the tail.
+
+    Since the optimal cost of a subset does not depend on its position in a ranking,
+    the streamed layers serve both as the forward DP over heads and as the backward
+    DP over tails. Only the layers up to the larger of the two sizes are evaluated.
+    """
+    tail_size = num_items - head_size
+    layers: Dict[int, CondorcetLayer] = {}
+    for layer in stream_layers(incremental_costs, num_items):
+        if layer.size in (head_size, tail_size):
+            layers[layer.size] = layer
+        if len(layers) == len({head_size, tail_size}):
+            break
+
+    heads = layers[head_size].masks
+    tails = heads ^ ((1 << num_items) - 1)
+    costs = layers[head_size].costs + layers[tail_size].cost(tails)
+    for bit in range(num_items):
+        idxs = np.flatnonzero((heads >> bit) & 1)
+        costs[idxs] += incremental_costs.costs(bit, tails[idxs])
+    return CondorcetLayer(num_items, head_size, heads, costs)
+
+
+def _next_layer(
+    incremental_costs: CondorcetIncrementalCosts, prev_layer: CondorcetLayer
+) -> CondorcetLayer:
+    # The rank of a mask is the sum of comb(p, t) over its bits, with t the 1-based
+    # index of the bit at position p. Removing one bit keeps the terms of the lower
+    # bits, and lowers the index of every higher bit by one. Sweeping the bits in
+    # ascending order, the rank of each mask without the current bit follows from
+    # running sums of both kinds of terms.
+    n = prev_layer.num_items
+    size = prev_layer.size + 1
+    table = binomials(n)
+    masks = combinations_of(n, size)
+    # Sum of the lowered terms comb(p, t - 1) over all bits of each mask.
+    lowered = np.zeros(len(masks), dtype=np.int64)
+    seen = np.zeros(len(masks), dtype=np.int64)
+    for bit in range(n):
+        has_bit = (masks >> bit) & 1
+        seen += has_bit
+        lowered += has_bit * table[bit, seen - has_bit]
+    # Sweep of the bits, removing each in turn.
+    best = np.full(len(masks), unreachable_cost(prev_layer.costs.dtype))
+    low_terms = np.zeros(len(masks), dtype=np.int64)
+    low_lowered = np.zeros(len(masks), dtype=np.int64)
+    seen[:] = 0
+    for bit in range(n):
+        idxs = np.flatnonzero((masks >> bit) & 1)
+        seen[idxs] += 1
+        index = seen[idxs]
+        lowered_high = lowered[idxs] - low_lowered[idxs] - table[bit, index - 1]
+        ranks = low_terms[idxs] + lowered_high
+        prev = masks[idxs] ^ (1 << bit)
+        cost = prev_layer.costs[ranks] + incremental_costs.costs(bit, prev)
+        best[idxs] = np.minimum(best[idxs], cost)
+        low_terms[idxs] += table[bit, index]
+        low_lowered[idxs] += table[bit, index - 1]
+    return CondorcetLayer(n, size, masks, best)
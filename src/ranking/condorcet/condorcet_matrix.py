@@ -43,6 +43,19 @@ class CondorcetMatrix(Generic[T]):
         """
         return np.maximum(-self.frozen_arr.arr, 0)
 
+    def select(self, items: Iterable[T]) -> CondorcetMatrix[T]:
+        """
+        Matrix restricted to just the `items`, in the given order. Raise a
+        `ValueError` if any of them is not in the matrix.
+        """
+        item_idx = {item: idx for idx, item in enumerate(self.items)}
+        selected = tuple(items)
+        try:
+            idxs = [item_idx[item] for item in selected]
+        except KeyError as err:
+            raise ValueError(f"unknown item {err}; values are {self.items}") from None
+        return CondorcetMatrix(selected, FrozenNdArray(self.mx[np.ix_(idxs, idxs)]))
+
     @property
     def borda(self) -> CondorcetMatrix[T]:
         r"""
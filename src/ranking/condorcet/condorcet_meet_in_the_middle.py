@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from itertools import islice
+from typing import Generic, Iterator, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+)
+from ranking.condorcet.condorcet_layers import CondorcetLayer, midpoint_layer
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_rankings import CondorcetRankings
+from ranking.dtypes.ranking import Ranking
+from ranking.dtypes.split import Split
+from util.dtypes.bitmask import iter_bits
+
+T = TypeVar("T")
+
+
+@dc.dataclass(frozen=True)
+class CondorcetMeetInTheMiddle(Generic[T]):
+    """
+    Exact Kemeny solver that meets in the middle of the rankings.
+
+    Every ranking splits into a head of its first `n // 2` items and a tail of the
+    rest. The optimal costs of all heads and of all tails of those sizes are computed
+    by the layer-streaming subset DP, and are joined with the split cost of placing
+    the head ahead of the tail. The heads of minimal joined cost are the optimal
+    midpoints. The optimal rankings are exactly the optimal rankings of such a head,
+    followed by the optimal rankings of its tail; the two halves are solved with
+    `CondorcetOptimum`.
+
+    The DP tables hold `O(comb(n, n // 2))` costs, rather than the `2**n` costs of
+    `CondorcetOptimum`. To construct, use the `of()` factory classmethod.
+    """
+
+    matrix: CondorcetMatrix[T]
+    _midpoints: CondorcetLayer
+
+    def optimal_cost(self) -> float:
+        """
+        Return the minimal cost of a ranking of all items.
+        """
+        return self._midpoints.costs.min().item()
+
+    def midpoints(self) -> Tuple[Split[T], ...]:
+        """
+        Return the optimal midpoints: the splits into the first `n // 2` items and the
+        remaining items of the optimal rankings, in ascending order of head mask.
+        """
+        return tuple(
+            Split[T].of(self._items(head), self._items(head ^ self._full_mask))
+            for head in self._optimal_heads()
+        )
+
+    def rankings(self, max_num: Optional[int] = None) -> CondorcetRankings[T]:
+        """
+        Return the optimal rankings. If `max_num` is given, return at most that many,
+        and flag the result as truncated if there are more.
+        """
+        permutations = self._rankings()
+        if max_num is not None:
+            rankings = list(islice(permutations, max_num + 1))
+            truncated = len(rankings) > max_num
+            rankings = rankings[:max_num]
+        else:
+            rankings = list(permutations)
+            truncated = False
+        return CondorcetRankings[T].of(self.optimal_cost(), rankings, truncated)
+
+    def _rankings(self) -> Iterator[Tuple[T, ...]]:
+        # Both halves are paged lazily, so that the work is bounded by the number of
+        # rankings drawn, rather than by the product of the numbers of half rankings.
+        for head in self._optimal_heads():
+            head_optimum = CondorcetOptimum[T].of(self.matrix.select(self._items(head)))
+            tail_optimum = CondorcetOptimum[T].of(
+                self.matrix.select(self._items(head ^ self._full_mask))
+            )
+            num_tail_rankings = tail_optimum.num_rankings()
+            for head_ranking in _paged_rankings(head_optimum):
+                for k in range(num_tail_rankings):
+                    yield head_ranking.items + tail_optimum.kth_ranking(k).items
+
+    def _optimal_heads(self) -> Iterator[int]:
+        costs = self._midpoints.costs
+        if costs.dtype.kind == "f":
+            optimal = np.isclose(costs, costs.min())
+        else:
+            optimal = costs == costs.min()
+        for idx in np.flatnonzero(optimal):
+            yield int(self._midpoints.masks[idx])
+
+    def _items(self, mask: int) -> Tuple[T, ...]:
+        return tuple(self.matrix.items[idx] for idx in iter_bits(mask))
+
+    @property
+    def _full_mask(self) -> int:
+        return (1 << len(self.matrix)) - 1
+
+    @classmethod
+    def of(cls, matrix: CondorcetMatrix[T]) -> CondorcetMeetInTheMiddle[T]:
+        n = len(matrix)
+        incremental_costs = CondorcetIncrementalCostLookup.of(matrix.violation_mx)
+        return cls(matrix, midpoint_layer(incremental_costs, n, n // 2))
+
+
+def _paged_rankings(optimum: CondorcetOptimum[T]) -> Iterator[Ranking[T]]:
+    # Optimal rankings in their fixed enumeration order.
+    return (optimum.kth_ranking(k) for k in range(optimum.num_rankings()))
@@ -0,0 +1,97 @@
+"""
+Merge-Condorcet: a mergesort analogue for approximate Kemeny ranking.
+
+The items are split in two halves, each half is ranked recursively, and the two
+rankings are merged. A merge keeps the order within each half, and picks the
+interleaving that minimises the violations between the halves. The cost of placing
+the next item of one half only depends on how many items of the other half remain,
+so the best interleaving follows from a DP over the `(a + 1) * (b + 1)` pairs of
+merged prefix lengths, evaluated one anti-diagonal at a time.
+
+A merge takes `O(a * b)` time, so the whole sort takes `O(n**2 log n)`. Halves of at
+most `base_size` items are ranked exactly with `CondorcetOptimum`.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import unreachable_cost
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.dtypes.costed_ranking import CostedRanking
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+T = TypeVar("T")
+
+
+def merge_ranking(matrix: CondorcetMatrix[T], base_size: int = 8) -> CostedRanking[T]:
+    """
+    A ranking of the matrix by Merge-Condorcet, with its cost.
+    """
+    idxs, cost = _sort(
+        np.arange(len(matrix)), matrix.mx, matrix.violation_mx, base_size
+    )
+    return CostedRanking[T].of([matrix.items[idx] for idx in idxs], cost)
+
+
+def _sort(
+    idxs: np.ndarray, mx: np.ndarray, violation_mx: np.ndarray, base_size: int
+) -> Tuple[np.ndarray, float]:
+    # The violation matrix is computed once by the caller and shared by all merges.
+    if len(idxs) <= max(base_size, 1):
+        sub_mx = FrozenNdArray(mx[np.ix_(idxs, idxs)])
+        sub_matrix = CondorcetMatrix[int](tuple(idxs.tolist()), sub_mx)
+        optimum = CondorcetOptimum[int].of(sub_matrix)
+        ranking = np.array(optimum.kth_ranking(0).items, dtype=int)
+        return ranking, optimum.costs.optimal_cost()
+    half = len(idxs) // 2
+    lhs, lhs_cost = _sort(idxs[:half], mx, violation_mx, base_size)
+    rhs, rhs_cost = _sort(idxs[half:], mx, violation_mx, base_size)
+    merged, merge_cost = _merge(lhs, rhs, violation_mx)
+    return merged, lhs_cost + rhs_cost + merge_cost
+
+
+def _merge(
+    lhs: np.ndarray, rhs: np.ndarray, violation_mx: np.ndarray
+) -> Tuple[np.ndarray, float]:
+    # costs[i, j] is the least cost of merging lhs[:i] and rhs[:j]. Placing lhs[i]
+    # next costs its violations against rhs[j:], and placing rhs[j] next costs its
+    # violations against lhs[i:]. Ties go to the lhs.
+    num_lhs, num_rhs = len(lhs), len(rhs)
+    lhs_steps = _suffix_sums(violation_mx[np.ix_(lhs, rhs)])
+    rhs_steps = _suffix_sums(violation_mx[np.ix_(rhs, lhs)]).T
+    dtype = np.result_type(violation_mx.dtype, np.int64)
+    costs = np.zeros((num_lhs + 1, num_rhs + 1), dtype=dtype)
+    from_lhs = np.zeros((num_lhs + 1, num_rhs + 1), dtype=bool)
+    for diagonal in range(1, num_lhs + num_rhs + 1):
+        i = np.arange(max(0, diagonal - num_rhs), min(num_lhs, diagonal) + 1)
+        j = diagonal - i
+        via_lhs = np.full(len(i), unreachable_cost(dtype))
+        via_rhs = np.full(len(i), unreachable_cost(dtype))
+        ok = i > 0
+        via_lhs[ok] = costs[i[ok] - 1, j[ok]] + lhs_steps[i[ok] - 1, j[ok]]
+        ok = j > 0
+        via_rhs[ok] = costs[i[ok], j[ok] - 1] + rhs_steps[i[ok], j[ok] - 1]
+        from_lhs[i, j] = via_lhs <= via_rhs
+        costs[i, j] = np.minimum(via_lhs, via_rhs)
+
+    merged = []
+    i, j = num_lhs, num_rhs
+    while i or j:
+        if from_lhs[i, j]:
+            i -= 1
+            merged.append(lhs[i])
+        else:
+            j -= 1
+            merged.append(rhs[j])
+    return np.array(merged[::-1], dtype=int), costs[num_lhs, num_rhs].item()
+
+
+def _suffix_sums(arr: np.ndarray) -> np.ndarray:
+    # Entry [i, j] is the sum of arr[i, j:], with a trailing column of zeros.
+    sums = np.zeros((arr.shape[0], arr.shape[1] + 1), dtype=arr.dtype)
+    sums[:, :-1] = np.cumsum(arr[:, ::-1], axis=1)[:, ::-1]
+    return sums
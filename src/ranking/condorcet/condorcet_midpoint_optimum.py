@@ -0,0 +1,66 @@
+"""
+One exact Kemeny-optimal ranking in memory `O(comb(n, n // 2))`, by divide and conquer.
+
+An optimal ranking splits into a head of its first `n // 2` items and a tail of the
+rest. Its cost is the optimal cost of the head, plus the optimal cost of the tail, plus
+the violations of the head ahead of the tail. The layer-streaming DP yields the optimal
+costs of all heads and tails of those sizes, so the best head follows from one
+vectorized minimum. The head and the tail are then ranked recursively, in the manner
+of Hirschberg's algorithm.
+
+This trades roughly twice the compute of the full subset DP for memory of a few layers
+of the subset lattice, rather than `2**n` costs and the incremental cost table.
+"""
+
+from __future__ import annotations
+
+from typing import Tuple, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+)
+from ranking.condorcet.condorcet_layers import midpoint_layer
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.dtypes.costed_ranking import CostedRanking
+from util.dtypes.bitmask import iter_bits
+
+T = TypeVar("T")
+
+
+def midpoint_optimal_ranking(
+    matrix: CondorcetMatrix[T], base_size: int = 12
+) -> CostedRanking[T]:
+    """
+    One optimal ranking of the matrix, with its cost. Sub-problems of at most
+    `base_size` items are solved directly with `CondorcetOptimum`.
+    """
+    if len(matrix) <= max(base_size, 1):
+        optimum = CondorcetOptimum[T].of(matrix)
+        return CostedRanking[T](optimum.kth_ranking(0), optimum.costs.optimal_cost())
+
+    head, tail, cost = _best_midpoint(matrix)
+    head_ranking = midpoint_optimal_ranking(matrix.select(head), base_size)
+    tail_ranking = midpoint_optimal_ranking(matrix.select(tail), base_size)
+    return CostedRanking[T].of(
+        head_ranking.ranking.items + tail_ranking.ranking.items, cost
+    )
+
+
+def _best_midpoint(
+    matrix: CondorcetMatrix[T],
+) -> Tuple[Tuple[T, ...], Tuple[T, ...], float]:
+    # Head and tail of an optimal ranking, with the head of size n // 2, and the cost
+    # of that ranking.
+    n = len(matrix)
+    incremental_costs = CondorcetIncrementalCostLookup.of(matrix.violation_mx)
+    midpoints = midpoint_layer(incremental_costs, n, n // 2)
+    best = int(np.argmin(midpoints.costs))
+    head = int(midpoints.masks[best])
+    return (
+        tuple(matrix.items[idx] for idx in iter_bits(head)),
+        tuple(matrix.items[idx] for idx in iter_bits(head ^ ((1 << n) - 1))),
+        midpoints.costs[best].item(),
+    )
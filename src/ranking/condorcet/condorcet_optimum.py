@@ -1,15 +1,29 @@
 from __future__ import annotations
 
 import dataclasses as dc
-from itertools import islice
-from typing import Generator, Generic, List, Optional, Tuple, TypeVar
-
-import numpy as np
-
+import random
+from itertools import islice, takewhile
+from typing import (
+    Generator,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from ranking.condorcet.condorcet_best_first import best_first_permutations
+from ranking.condorcet.condorcet_ideal_costs import CondorcetIdealCosts
 from ranking.condorcet.condorcet_matrix import CondorcetMatrix
 from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
 from ranking.condorcet.condorcet_rankings import CondorcetRankings
 from ranking.condorcet.condorcet_splits import CondorcetSplits
+from ranking.condorcet.condorcet_utils import pinned_split_masks
+from ranking.dtypes.costed_ranking import CostedRanking
+from ranking.dtypes.ranking import Ranking
 from util.dtypes.bitmask import iter_bits
 
 T = TypeVar("T")
@@ -31,8 +45,13 @@ class CondorcetOptimum(Generic[T]):
     The cost of a split of the items into a head group and a tail group is the
     penalty over all pairs of an item from the head group and an item from the tail
     group.
+
+    If precedence constraints are given or derived, the optimum is solved over the
+    ideal lattice of `CondorcetIdealCosts` instead of all subsets. The optimal
+    rankings then respect the constraints. Runners-up and splits need every subset,
+    and are not available in that case.
     """
-    costs: CondorcetSubsetCosts[T]
+    costs: Union[CondorcetSubsetCosts[T], CondorcetIdealCosts[T]]
 
     def rankings(self, max_num: Optional[int] = None) -> CondorcetRankings[T]:
         score = self.costs.optimal_cost()
@@ -52,48 +71,151 @@ class CondorcetOptimum(Generic[T]):
 
         return CondorcetRankings[T].of(score, item_permutations, truncated)
 
-    def splits(self, head_size: int) -> CondorcetSplits[T]:
-        tail_size = len(self.costs.items) - head_size
-        idxs = self.costs.mask_sizes == tail_size
-        min_val = self.costs.split_costs[idxs].min()
-        tail_masks = np.where(idxs & (self.costs.split_costs == min_val))[0]
+    def num_rankings(self) -> int:
+        """
+        Return the number of optimal rankings, without enumerating them.
+        """
+        return self.costs.num_optimal_arrangements()
+
+    def kth_ranking(self, k: int) -> Ranking[T]:
+        """
+        Return the optimal ranking at index `k` of the enumeration order of
+        `rankings()`. This order is fixed for a given matrix, so consecutive values of
+        `k` page through the optimal rankings. Raise an `IndexError` if `k` is not
+        below `num_rankings()`.
+        """
+        if not 0 <= k < self.num_rankings():
+            raise IndexError(f"ranking {k} out of range for {self.num_rankings()}")
+        mask = (1 << self.costs.num_items) - 1
+        ranking: List[int] = []
+        while mask:
+            for bit in iter_bits(self.costs.tight_bits(mask)):
+                count = self.costs.num_optimal_arrangements(mask ^ (1 << bit))
+                if k < count:
+                    break
+                k -= count
+            ranking.append(bit)
+            mask ^= 1 << bit
+        return Ranking[T].of([self.costs.items[idx] for idx in ranking])
+
+    def sample_rankings(self, num: int, seed: int = 0) -> Tuple[Ranking[T], ...]:
+        """
+        Draw `num` optimal rankings uniformly at random, with replacement. The draw is
+        reproducible for a given `seed`.
+        """
+        rng = random.Random(seed)
+        total = self.num_rankings()
+        return tuple(self.kth_ranking(rng.randrange(total)) for _ in range(num))
+
+    def k_best(self, k: int) -> Tuple[CostedRanking[T], ...]:
+        """
+        Return the `k` rankings of lowest cost, in non-decreasing order of cost. The
+        optimal rankings come first, followed by the runners-up.
+        """
+        return tuple(islice(self._costed_rankings(), k))
+
+    def rankings_within(self, delta: float) -> Iterator[CostedRanking[T]]:
+        """
+        Iterator over all rankings whose cost exceeds the optimal cost by at most
+        `delta`, in non-decreasing order of cost. Rankings are produced lazily.
+        """
+        max_cost = self.costs.optimal_cost() + delta
+        return takewhile(lambda costed: costed.cost <= max_cost, self._costed_rankings())
+
+    def splits(
+        self,
+        head_size: int,
+        must_head: Iterable[T] = (),
+        must_tail: Iterable[T] = (),
+    ) -> CondorcetSplits[T]:
+        """
+        Return the optimal splits with a head of `head_size` items. The optimal splits
+        of every size are indexed on the first query, so each query only costs the
+        size of its answer.
+
+        If `must_head` or `must_tail` are given, return the optimal splits among those
+        with these items in the head and in the tail, respectively. These are filtered
+        from the split costs of all masks of the tail size. Raise a `ValueError` if
+        the pinned items are unknown, conflicting or do not fit.
+        """
+        costs = self._subset_costs()
+        head_mask, tail_mask = pinned_split_masks(costs.items, must_head, must_tail)
+        cost, tail_masks = costs.optimal_split_tails(
+            costs.num_items - head_size, required=tail_mask, excluded=head_mask
+        )
         return CondorcetSplits[T].of_tails(
-            cost=float(min_val),
-            tails=(self.costs.mask_to_items(tail_mask) for tail_mask in tail_masks),
-            items=self.costs.items,
+            cost=cost,
+            tails=(costs.mask_to_items(tail_mask) for tail_mask in tail_masks),
+            items=costs.items,
         )
 
-    def _rankings(self) -> Generator[Tuple[int, ...]]:
-        n = self.costs.num_items
-        mask = (1 << n) - 1
-        suffix: List[int] = []
-        for permutation in self._rankings_recursive(mask, suffix):
-            yield permutation
+    def all_splits(self) -> Tuple[CondorcetSplits[T], ...]:
+        """
+        Return the optimal splits for every head size, indexed by head size from 0 up
+        to and including the number of items.
+        """
+        return tuple(self.splits(size) for size in range(self.costs.num_items + 1))
 
-    def _rankings_recursive(
-        self,
-        mask: int,
-        suffix: List[int],
-    ) -> Generator[Tuple[int, ...]]:
-        if mask == 0:
-            yield tuple(suffix)
-        else:
-            for bit in iter_bits(mask):
-                prev = mask ^ (1 << bit)
-                if np.isclose(
-                    self.costs.optimal_cost(mask),
-                    self.costs.optimal_cost(prev)
-                    + self.costs.incremental_cost(bit, prev),
-                ):
-                    suffix.append(bit)
-                    for permutation in self._rankings_recursive(
-                        prev,
-                        suffix,
-                    ):
-                        yield permutation
-                    suffix.pop()
+    def _subset_costs(self) -> CondorcetSubsetCosts[T]:
+        if not isinstance(self.costs, CondorcetSubsetCosts):
+            raise ValueError("only available without precedence constraints")
+        return self.costs
+
+    def _costed_rankings(self) -> Iterator[CostedRanking[T]]:
+        for cost, permutation in best_first_permutations(self._subset_costs()):
+            items = [self.costs.items[idx] for idx in permutation]
+            yield CostedRanking[T].of(items, cost)
+
+    def _rankings(self) -> Generator[Tuple[int, ...]]:
+        # Depth-first walk over the tight bits, from the full mask down to the empty
+        # mask. Every tight bit leads to at least one optimal ranking, so the walk
+        # never backtracks out of a dead end. The stack holds, per depth, the tight
+        # bits that remain to be tried.
+        mask = (1 << self.costs.num_items) - 1
+        ranking: List[int] = []
+        pending = [self.costs.tight_bits(mask)]
+        while True:
+            if mask == 0:
+                yield tuple(ranking)
+            while pending and pending[-1] == 0:
+                pending.pop()
+                if ranking:
+                    mask |= 1 << ranking.pop()
+            if not pending:
+                return
+            lowest = pending[-1] & -pending[-1]
+            pending[-1] ^= lowest
+            ranking.append(lowest.bit_length() - 1)
+            mask ^= lowest
+            pending.append(self.costs.tight_bits(mask))
 
     @classmethod
-    def of(cls, matrix: CondorcetMatrix[T]) -> CondorcetOptimum[T]:
-        costs = CondorcetSubsetCosts[T].of(matrix)
+    def of(
+        cls,
+        matrix: CondorcetMatrix[T],
+        table_free: bool = False,
+        workers: int = 1,
+        precedences: Optional[Iterable[Tuple[T, T]]] = None,
+        derive_precedences: bool = False,
+    ) -> CondorcetOptimum[T]:
+        """
+        Solve the optimum of the matrix. If `precedences` are given, only rankings in
+        which each `lhs` precedes its `rhs` are considered. If `derive_precedences`,
+        the dominance precedences that hold in every optimal ranking are added to
+        shrink the lattice; see `CondorcetIdealCosts`.
+
+        `table_free` and `workers` configure `CondorcetSubsetCosts`. The ideal lattice
+        has no such options, so combining them with precedences raises a `ValueError`.
+        """
+        if precedences is not None or derive_precedences:
+            if table_free or workers != 1:
+                raise ValueError("table_free and workers do not apply to precedences")
+            return cls(
+                CondorcetIdealCosts[T].of(
+                    matrix, precedences or (), derive_precedences=derive_precedences
+                )
+            )
+        costs = CondorcetSubsetCosts[T].of(
+            matrix, table_free=table_free, workers=workers
+        )
         return cls(costs)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Dict, FrozenSet, Generic, Iterable, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_splits import CondorcetSplits
+
+T = TypeVar("T")
+
+
+@dc.dataclass(frozen=True)
+class CondorcetSplitSearch(Generic[T]):
+    """
+    Low-cost splits of a Condorcet matrix with a head of a given size, found by local
+    search over swaps of one head item with one tail item, in the manner of
+    Kernighan and Lin. This needs no subset tables, so it scales to hundreds of items.
+
+    With `a[x]` the violations of x ahead of the tail, and `b[x]` those of the head
+    ahead of x, swapping head item h with tail item t changes the cost by
+    `(a[t] - b[t]) + (b[h] - a[h]) + V[h, t] + V[t, h]`. All swaps are scored at once
+    from these gain vectors, the best one is applied while it lowers the cost, and the
+    vectors are updated in O(n) per swap. The search starts from the given `heads`, if
+    any, then from the Borda cut and from seeded random heads.
+
+    `splits` holds the cheapest splits found, and `lower_bound` a bound on the optimal
+    split cost: in any split, each head item is ahead of at least the tail size
+    cheapest entries of its row, and each tail item behind at least the head size
+    cheapest entries of its column. To construct, use the `of()` factory classmethod.
+    """
+
+    splits: CondorcetSplits[T]
+    lower_bound: float
+
+    @property
+    def gap(self) -> float:
+        """
+        The difference between the cost of the splits found and the lower bound.
+        """
+        return self.splits.cost - self.lower_bound
+
+    @classmethod
+    def of(
+        cls,
+        matrix: CondorcetMatrix[T],
+        head_size: int,
+        num_restarts: int = 8,
+        seed: int = 0,
+        heads: Iterable[Iterable[T]] = (),
+    ) -> CondorcetSplitSearch[T]:
+        num_items = len(matrix)
+        if not 0 <= head_size <= num_items:
+            raise ValueError(f"head size {head_size} out of range for {num_items}")
+        violation_mx = matrix.violation_mx
+        exact = violation_mx.dtype.kind in "iu"
+        rng = np.random.default_rng(seed)
+        borda = np.argsort(-matrix.mx.sum(axis=1), kind="stable")
+        item_idx = {item: idx for idx, item in enumerate(matrix.items)}
+        starts = [[item_idx[item] for item in head] for head in heads]
+        if any(len(start) != head_size for start in starts):
+            raise ValueError(f"starting heads must have {head_size} items")
+        starts.append(borda[:head_size])
+        for _ in range(max(num_restarts, 1) - 1):
+            starts.append(rng.permutation(num_items)[:head_size])
+
+        best_cost = None
+        best_heads: Dict[FrozenSet[int], None] = {}
+        for start in starts:
+            in_head = np.zeros(num_items, dtype=bool)
+            in_head[start] = True
+            cost = _descend(in_head, violation_mx, exact)
+            head = frozenset(np.flatnonzero(in_head).tolist())
+            if best_cost is not None and _tied(cost, best_cost, exact):
+                best_heads[head] = None
+            elif best_cost is None or cost < best_cost:
+                best_cost, best_heads = cost, {head: None}
+
+        items = matrix.items
+        splits = CondorcetSplits[T].of_tails(
+            cost=best_cost,
+            tails=(
+                [items[idx] for idx in range(num_items) if idx not in head]
+                for head in best_heads
+            ),
+            items=items,
+        )
+        return cls(splits, _lower_bound(violation_mx, head_size))
+
+
+def _descend(in_head: np.ndarray, violation_mx: np.ndarray, exact: bool) -> float:
+    # Apply the best swap while it lowers the cost. Updates in_head in place.
+    ahead_of_tail = violation_mx[:, ~in_head].sum(axis=1)
+    behind_head = violation_mx[in_head, :].sum(axis=0)
+    cost = ahead_of_tail[in_head].sum().item()
+    pair_costs = violation_mx + violation_mx.T
+    while in_head.any() and not in_head.all():
+        heads, tails = np.flatnonzero(in_head), np.flatnonzero(~in_head)
+        deltas = (
+            (behind_head[heads] - ahead_of_tail[heads])[:, np.newaxis]
+            + (ahead_of_tail[tails] - behind_head[tails])[np.newaxis, :]
+            + pair_costs[np.ix_(heads, tails)]
+        )
+        h_idx, t_idx = np.unravel_index(np.argmin(deltas), deltas.shape)
+        delta = deltas[h_idx, t_idx].item()
+        if delta >= 0 or (not exact and np.isclose(cost + delta, cost)):
+            break
+        head, tail = heads[h_idx], tails[t_idx]
+        in_head[head], in_head[tail] = False, True
+        ahead_of_tail += violation_mx[:, head] - violation_mx[:, tail]
+        behind_head += violation_mx[tail, :] - violation_mx[head, :]
+        cost += delta
+    return cost
+
+
+def _lower_bound(violation_mx: np.ndarray, head_size: int) -> float:
+    num_items = len(violation_mx)
+    if head_size in (0, num_items):
+        return violation_mx.dtype.type(0).item()
+    off_diagonal = violation_mx[~np.eye(num_items, dtype=bool)].reshape(num_items, -1)
+    col_off_diagonal = violation_mx.T[~np.eye(num_items, dtype=bool)].reshape(
+        num_items, -1
+    )
+    tail_size = num_items - head_size
+    row_bounds = np.sort(off_diagonal, axis=1)[:, :tail_size].sum(axis=1)
+    col_bounds = np.sort(col_off_diagonal, axis=1)[:, :head_size].sum(axis=1)
+    return max(
+        np.sort(row_bounds)[:head_size].sum().item(),
+        np.sort(col_bounds)[:tail_size].sum().item(),
+    )
+
+
+def _tied(lhs: float, rhs: float, exact: bool) -> bool:
+    return lhs == rhs if exact else bool(np.isclose(lhs, rhs))
@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import dataclasses as dc
 from functools import cached_property
-from typing import Generic, Self, Tuple, TypeVar
+from typing import Generic, List, Self, Tuple, TypeVar
 
 import numpy as np
 
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+    CondorcetIncrementalCosts,
+    CondorcetIncrementalCostTable,
+    LayerMinimum,
+    count_dtype,
+)
 from ranking.condorcet.condorcet_matrix import CondorcetMatrix
-from util.dtypes.bitmask import iter_bits
+from util.dtypes.bitmask import iter_bits, popcount_layers, popcounts
+from util.nppd.parallel_slices import for_each_slice
 
 T = TypeVar("T")
 
+# Smallest number of masks worth handing to a worker thread.
+_MIN_SLICE = 1 << 14
+
 
 @dc.dataclass(frozen=True)
 class CondorcetSubsetCosts(Generic[T]):
@@ -27,10 +38,24 @@ class CondorcetSubsetCosts(Generic[T]):
 
     These incremental costs and optimal costs are used to determine the optimal
     Condorcet rankings and the optimal Condorcet splits.
+
+    Integral matrices are solved in exact integer arithmetic: every cost is an int64,
+    and optimality is tested with plain equality. Floats are only used for matrices
+    with fractional entries.
+
+    The incremental costs come from one of two backends: a compact table of all
+    `n * 2**(n-1)` incremental costs, or a table-free lookup that computes them on
+    demand from the rows of the violation matrix. The latter keeps the memory of this
+    container at `O(2**n)`, for the optimal costs.
+
+    All masks within a popcount layer are independent. With `workers` above 1, each
+    layer of the DP is split into slices that run on a pool of threads, writing into
+    the shared cost arrays.
     """
 
     items: Tuple[T, ...]
-    _incremental_costs: np.ndarray
+    _incremental_costs: CondorcetIncrementalCosts
+    workers: int = dc.field(default=1, compare=False)
 
     @property
     def num_items(self) -> int:
@@ -53,18 +78,68 @@ class CondorcetSubsetCosts(Generic[T]):
         """
         return self._mask_sizes.copy()
 
+    @property
+    def is_integral(self) -> bool:
+        """
+        True iff the costs are exact integers.
+        """
+        return self._incremental_costs.dtype.kind in "iu"
+
     def incremental_cost(self, bit: int, mask: int) -> float:
         """
         Return the penalty cost of arranging the item represented by the bit before the
         items represented by the bitmask.
         """
-        return float(self._incremental_costs[bit, mask])
+        return self._incremental_costs.costs(bit, np.asarray(mask)).item()
 
     def optimal_cost(self, mask: int = -1) -> float:
         """
         Return the minimal cost paid to arrange the items represented by the bitmask.
         """
-        return self._optimal_costs[mask]
+        return self._optimal_costs[mask].item()
+
+    def is_tight(self, bit: int, mask: int) -> bool:
+        """
+        Return True iff arranging the item represented by the bit ahead of the other
+        items of the bitmask is part of an optimal arrangement of the bitmask.
+        """
+        return bool((self.tight_bits(mask) >> bit) & 1)
+
+    def tight_bits(self, mask: int) -> int:
+        """
+        Return the bitmask of the items that can be arranged first in an optimal
+        arrangement of the items represented by the bitmask.
+        """
+        return int(self._optimum.tight_bits[mask])
+
+    def num_optimal_arrangements(self, mask: int = -1) -> int:
+        """
+        Return the number of distinct optimal arrangements of the items represented by
+        the bitmask.
+        """
+        return int(self._optimal_counts[mask])
+
+    def optimal_split_tails(
+        self, tail_size: int, required: int = 0, excluded: int = 0
+    ) -> Tuple[float, np.ndarray]:
+        """
+        Return the minimal split cost over the masks of `tail_size` items, and the
+        ascending array of the masks that attain it. If `required` or `excluded` are
+        given, only masks that contain every bit of `required` and no bit of
+        `excluded` qualify. Raise a `ValueError` if no mask qualifies.
+        """
+        if not 0 <= tail_size <= self.num_items:
+            raise ValueError(f"tail size {tail_size} out of range for {self.num_items}")
+        if not required and not excluded:
+            optimum = self._split_index[tail_size]
+            return optimum.cost, optimum.tails
+        layer = self._popcount_layers[tail_size]
+        layer = layer[((layer & required) == required) & ((layer & excluded) == 0)]
+        if len(layer) == 0:
+            raise ValueError(f"no mask of {tail_size} items meets the constraints")
+        costs = self._split_costs[layer]
+        min_cost = costs.min()
+        return min_cost.item(), layer[costs == min_cost]
 
     def mask_to_items(self, mask: int) -> Tuple[T, ...]:
         """
@@ -74,45 +149,138 @@ class CondorcetSubsetCosts(Generic[T]):
 
     @cached_property
     def _split_costs(self) -> np.ndarray:
-        return np.nansum(self._incremental_costs, axis=0)
+        size = 1 << self.num_items
+        masks = np.arange(size)
+        split_costs = np.zeros(size, dtype=self._cost_dtype)
+        for bit in range(self.num_items):
+            _masks_without_bit(split_costs, bit)[...] += self._incremental_costs.costs(
+                bit, _masks_without_bit(masks, bit)
+            )
+        return split_costs
 
     @cached_property
-    def _mask_sizes(self) -> np.ndarray:
-        return np.sum(np.isnan(self._incremental_costs), axis=0)
+    def _split_index(self) -> Tuple[_SplitOptimum, ...]:
+        # The masks are grouped by popcount once, so that every split query only
+        # touches its answer.
+        index = []
+        for layer in self._popcount_layers:
+            costs = self._split_costs[layer]
+            min_cost = costs.min()
+            index.append(_SplitOptimum(min_cost.item(), layer[costs == min_cost]))
+        return tuple(index)
+
+    @cached_property
+    def _popcount_layers(self) -> List[np.ndarray]:
+        return popcount_layers(self.num_items)
 
     @cached_property
+    def _mask_sizes(self) -> np.ndarray:
+        return popcounts(self.num_items)
+
+    @property
     def _optimal_costs(self) -> np.ndarray:
+        return self._optimum.costs
+
+    @cached_property
+    def _optimum(self) -> _SubsetOptimum:
+        # Masks only depend on masks with one bit fewer, so the DP is evaluated one
+        # popcount layer at a time, each layer in bulk.
         size = 1 << self.num_items
-        optimal_costs = np.full(size, np.inf, dtype=np.float64)
-        optimal_costs[0] = 0.0
-        for mask in range(1, size):
-            best = np.inf
-            for bit in iter_bits(mask):
-                prev = mask ^ (1 << bit)
-                cost = optimal_costs[prev] + self._incremental_costs[bit, prev]
-                if cost < best:
-                    best = cost
-                    if best == 0.0:
-                        break
-            optimal_costs[mask] = best
-        return optimal_costs
+        optimum = _SubsetOptimum(
+            costs=np.zeros(size, dtype=self._cost_dtype),
+            tight_bits=np.zeros(size, dtype=_bits_dtype(self.num_items)),
+        )
+        for layer in popcount_layers(self.num_items)[1:]:
+            for_each_slice(
+                lambda slc: self._solve_layer(layer[slc], optimum),
+                len(layer),
+                self.workers,
+                _MIN_SLICE,
+            )
+        return optimum
+
+    def _solve_layer(self, layer: np.ndarray, optimum: _SubsetOptimum) -> None:
+        # Minimum over the removed bit of the optimal cost of the mask without the bit,
+        # plus the incremental cost of placing the bit ahead of it. The bits attaining
+        # the minimum are collected along the way.
+        minimum = LayerMinimum.of(
+            len(layer), self._cost_dtype, optimum.tight_bits.dtype
+        )
+        for bit in range(self.num_items):
+            idxs = np.flatnonzero((layer >> bit) & 1)
+            prev = layer[idxs] ^ (1 << bit)
+            cost = optimum.costs[prev] + self._incremental_costs.costs(bit, prev)
+            minimum.relax(idxs, cost, 1 << bit)
+        optimum.costs[layer] = minimum.best
+        optimum.tight_bits[layer] = minimum.tight
+
+    @cached_property
+    def _optimal_counts(self) -> np.ndarray:
+        # The optimal arrangements of a mask are those starting with a tight bit,
+        # followed by an optimal arrangement of the rest of the mask.
+        counts = np.zeros(1 << self.num_items, dtype=count_dtype(self.num_items))
+        counts[0] = 1
+        for layer in popcount_layers(self.num_items)[1:]:
+            for_each_slice(
+                lambda slc: self._count_layer(layer[slc], counts),
+                len(layer),
+                self.workers,
+                _MIN_SLICE,
+            )
+        return counts
+
+    def _count_layer(self, layer: np.ndarray, counts: np.ndarray) -> None:
+        tight = self._optimum.tight_bits[layer]
+        total = np.zeros(len(layer), dtype=counts.dtype)
+        for bit in range(self.num_items):
+            idxs = np.flatnonzero((tight >> bit) & 1)
+            total[idxs] += counts[layer[idxs] ^ (1 << bit)]
+        counts[layer] = total
+
+    @property
+    def _cost_dtype(self) -> np.dtype:
+        return np.result_type(self._incremental_costs.dtype, np.int64)
 
     @classmethod
-    def of(cls, condorcet_matrix: CondorcetMatrix[T]) -> Self:
-        violation_mx = condorcet_matrix.violation_mx.astype(np.float64)
-        n = len(condorcet_matrix)
-        size = 1 << len(condorcet_matrix)
-        incremental_cost = np.zeros((n, size), dtype=np.float64)
-        for item_idx in range(n):
-            row = violation_mx[item_idx]
-            bit = 1 << item_idx
-            for mask in range(1, size):
-                if mask & bit:  # invalid: bit is in mask.
-                    incremental_cost[item_idx, mask] = np.nan
-                    continue
-                lsb = mask & -mask
-                u = lsb.bit_length() - 1
-                incremental_cost[item_idx, mask] = (
-                    incremental_cost[item_idx, mask ^ lsb] + row[u]
-                )
-        return cls(condorcet_matrix.items, incremental_cost)
+    def of(
+        cls,
+        condorcet_matrix: CondorcetMatrix[T],
+        table_free: bool = False,
+        workers: int = 1,
+    ) -> Self:
+        """
+        Construct the subset costs of the matrix. If `table_free`, the incremental
+        costs are computed on demand instead of being materialised in a table. The
+        table and the DP run on `workers` threads.
+        """
+        violation_mx = condorcet_matrix.violation_mx
+        incremental_costs: CondorcetIncrementalCosts
+        if table_free:
+            incremental_costs = CondorcetIncrementalCostLookup.of(violation_mx)
+        else:
+            incremental_costs = CondorcetIncrementalCostTable.of(violation_mx, workers)
+        return cls(condorcet_matrix.items, incremental_costs, workers)
+
+
+@dc.dataclass(frozen=True)
+class _SubsetOptimum:
+    # Optimal cost per mask, and the bitmask of the bits that attain it.
+    costs: np.ndarray
+    tight_bits: np.ndarray
+
+
+@dc.dataclass(frozen=True)
+class _SplitOptimum:
+    # Minimal split cost over the masks of one popcount, and the masks attaining it.
+    cost: float
+    tails: np.ndarray
+
+
+def _bits_dtype(num_bits: int) -> np.dtype:
+    return np.dtype(np.uint32 if num_bits <= 32 else np.uint64)
+
+
+def _masks_without_bit(arr: np.ndarray, bit: int) -> np.ndarray:
+    # View on the entries of a mask-indexed array whose mask does not contain the bit,
+    # in the order of the masks with that bit dropped.
+    return arr.reshape(-1, 2, 1 << bit)[:, 0, :]
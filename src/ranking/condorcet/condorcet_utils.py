@@ -9,7 +9,9 @@ Condorcet penalty of ranking $i$ ahead of $j$.
 from __future__ import annotations
 
 from itertools import combinations, product
-from typing import Iterable, Tuple, TypeVar
+from typing import FrozenSet, Iterable, List, Tuple, TypeVar
+
+import numpy as np
 
 from ranking.condorcet.condorcet_matrix import CondorcetMatrix
 from ranking.dtypes.ranking import Ranking
@@ -28,6 +30,17 @@ def ranking_cost(ranking: Ranking[T], matrix: CondorcetMatrix[T]) -> float:
     return _idx_pairs_cost(pairs, matrix)
 
 
+def order_cost(order: np.ndarray, violation_mx: np.ndarray) -> float:
+    """
+    The cost of the ranking given as an array of item indices, for a violation matrix.
+    Summed row by row, to avoid an n-by-n temporary.
+    """
+    cost = violation_mx.dtype.type(0)
+    for pos, idx in enumerate(order):
+        cost += violation_mx[idx, order[pos + 1 :]].sum()
+    return cost.item()
+
+
 def split_cost(split: Split[T], matrix: CondorcetMatrix[T]) -> float:
     """
     The sum of the cost over the Cartesian product of the head and tail of the split.
@@ -39,6 +52,72 @@ def split_cost(split: Split[T], matrix: CondorcetMatrix[T]) -> float:
     return _idx_pairs_cost(pairs, matrix)
 
 
+def dominance_precedences(matrix: CondorcetMatrix[T]) -> FrozenSet[Tuple[T, T]]:
+    r"""
+    The pairs $(i, j)$ such that $i$ precedes $j$ in every optimal ranking.
+
+    Swapping $i$ and $j$ in a ranking that puts $j$ first saves $M_{ij}$ on the pair
+    itself, and changes the cost of every item $x$ in between by $M_{jx} - M_{ix}$.
+    If $M_{ij}$ exceeds $\sum_x \max(0, M_{jx} - M_{ix})$, the swap always pays off.
+    """
+    mx = matrix.mx
+    worst_case = np.maximum(0, mx[np.newaxis, :, :] - mx[:, np.newaxis, :]).sum(axis=2)
+    lhs_idxs, rhs_idxs = np.nonzero(mx > worst_case)
+    return frozenset(
+        (matrix.items[lhs], matrix.items[rhs])
+        for lhs, rhs in zip(lhs_idxs.tolist(), rhs_idxs.tolist())
+    )
+
+
+def packed_cyclic_triangles(mx: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Greedily pack edge-disjoint cyclic triangles of the majority tournament of the
+    Condorcet matrix `mx`, heaviest first. Return the triangles as rows of item
+    indices, and their weights, the smallest margin of each triangle.
+
+    Any ranking reverses at least one edge of a cyclic triangle, which costs at least
+    its weight. The triangles share no pair, so the summed weights of the triangles
+    inside a set of items bound the cost of any ranking of that set from below.
+    """
+    num_items = len(mx)
+    triples = np.array(list(combinations(range(num_items), 3)), dtype=int)
+    i, j, k = triples.reshape(-1, 3).T
+    forward = (mx[i, j] > 0) & (mx[j, k] > 0) & (mx[k, i] > 0)
+    backward = (mx[i, j] < 0) & (mx[j, k] < 0) & (mx[k, i] < 0)
+    cyclic = triples.reshape(-1, 3)[forward | backward]
+    i, j, k = cyclic.T
+    weights = np.minimum(np.minimum(abs(mx[i, j]), abs(mx[j, k])), abs(mx[k, i]))
+
+    used = np.zeros((num_items, num_items), dtype=bool)
+    packed: List[int] = []
+    for idx in np.argsort(-weights, kind="stable"):
+        a, b, c = cyclic[idx]
+        if used[a, b] or used[b, c] or used[a, c]:
+            continue
+        used[a, b] = used[b, c] = used[a, c] = True
+        packed.append(idx)
+    return cyclic[packed].reshape(-1, 3), weights[packed]
+
+
+def pinned_split_masks(
+    items: Tuple[T, ...], must_head: Iterable[T] = (), must_tail: Iterable[T] = ()
+) -> Tuple[int, int]:
+    """
+    The bitmasks over `items` of the items pinned to the head and to the tail of a
+    split. Raise a `ValueError` for unknown items, or items pinned to both sides.
+    """
+    item_to_idx = {item: idx for idx, item in enumerate(items)}
+    must_head, must_tail = set(must_head), set(must_tail)
+    unknown = (must_head | must_tail) - item_to_idx.keys()
+    if unknown:
+        raise ValueError(f"unknown pinned items: {sorted(map(str, unknown))}")
+    if must_head & must_tail:
+        raise ValueError("items pinned to both head and tail")
+    head_mask = sum(1 << item_to_idx[item] for item in must_head)
+    tail_mask = sum(1 << item_to_idx[item] for item in must_tail)
+    return head_mask, tail_mask
+
+
 def _idx_pairs_cost(
     pairs: Iterable[Tuple[int, int]], matrix: CondorcetMatrix[T]
 ) -> float:
@@ -0,0 +1,83 @@
+"""
+Large-neighbourhood refinement of a ranking by exact re-ordering of sliding windows.
+
+Re-ordering a window of consecutive items of a ranking only changes the pairs within
+the window: every item outside it stays ahead of, or behind, the whole window. So the
+best order of a window given its context is the optimal ranking of the window's own
+sub-matrix, which `CondorcetOptimum` solves exactly for windows of up to about 18
+items.
+
+Windows of `window_size` items slide along the ranking with a stride of `stride`, and
+a window is replaced only if that strictly lowers the cost. Passes repeat until one
+pass improves no window. Each replacement lowers the cost, so this terminates.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, TypeVar
+
+import numpy as np
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import order_cost
+from ranking.dtypes.costed_ranking import CostedRanking
+from ranking.dtypes.ranking import Ranking
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+T = TypeVar("T")
+
+
+def refine_by_windows(
+    matrix: CondorcetMatrix[T],
+    ranking: Ranking[T],
+    window_size: int = 12,
+    stride: Optional[int] = None,
+) -> CostedRanking[T]:
+    """
+    Refine a full ranking of the items of the matrix, and return it with its cost.
+    The stride defaults to half the window size.
+    """
+    item_to_idx = {item: idx for idx, item in enumerate(matrix.items)}
+    order = [item_to_idx.get(item, -1) for item in ranking.items]
+    if sorted(order) != list(range(len(matrix))):
+        raise ValueError("ranking must hold every item of the matrix once")
+    window_size = max(1, min(window_size, len(order)))
+    stride = max(1, stride if stride is not None else window_size // 2)
+    starts = list(range(0, len(order) - window_size + 1, stride))
+    if starts and starts[-1] != len(order) - window_size:
+        starts.append(len(order) - window_size)
+
+    # Windows whose content is unchanged since they were last found optimal are
+    # skipped, so later passes only revisit the neighbourhood of earlier moves.
+    optimal: Dict[int, List[int]] = {}
+    improved = True
+    while improved:
+        improved = False
+        for start in starts:
+            window = order[start : start + window_size]
+            if optimal.get(start) == window:
+                continue
+            better = _better_order(window, matrix.mx)
+            if better is not None:
+                order[start : start + window_size] = better
+                improved = True
+            optimal[start] = order[start : start + window_size]
+    cost = order_cost(np.array(order, dtype=int), matrix.violation_mx)
+    return CostedRanking[T].of([matrix.items[idx] for idx in order], cost)
+
+
+def _better_order(window: List[int], mx: np.ndarray) -> Optional[List[int]]:
+    # An optimal order of the window if it is strictly cheaper than the current one.
+    # The sub-matrix lists the window in its current order.
+    sub_mx = mx[np.ix_(window, window)]
+    optimum = CondorcetOptimum[int].of(
+        CondorcetMatrix[int](tuple(window), FrozenNdArray(sub_mx))
+    )
+    optimal_cost = optimum.costs.optimal_cost()
+    current_cost = order_cost(np.arange(len(window)), np.maximum(0, -sub_mx))
+    if current_cost <= optimal_cost:
+        return None
+    if not optimum.costs.is_integral and np.isclose(current_cost, optimal_cost):
+        return None
+    return list(optimum.kth_ranking(0).items)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Generic, Sequence, TypeVar
+
+from ranking.dtypes.ranking import Ranking
+
+T = TypeVar("T", covariant=True)
+
+
+@dc.dataclass(frozen=True)
+class CostedRanking(Generic[T]):
+    """
+    A ranking of items together with its cost, being the total violation penalty of
+    the ranking under some Condorcet matrix.
+    """
+
+    ranking: Ranking[T]
+    cost: float
+
+    def __str__(self) -> str:
+        items_str: str = ", ".join(map(str, self.ranking.items))
+        return f"CostedRanking(cost={self.cost}, ranking=({items_str}))"
+
+    @classmethod
+    def of(cls, items: Sequence[T], cost: float) -> CostedRanking[T]:
+        return cls(Ranking[T].of(items), cost)
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Generic, Tuple, TypeVar
+
+from ranking.dtypes.ranking import Ranking
+
+T = TypeVar("T", covariant=True)
+
+
+@dc.dataclass(frozen=True)
+class FeedbackArcRanking(Generic[T]):
+    """
+    A ranking of the nodes of a digraph, together with the edges it violates. An edge
+    (u, v) is violated if v is ranked ahead of u. The violated edges form a feedback
+    arc set: without them, the ranking is a topological order of the digraph.
+    """
+
+    ranking: Ranking[T]
+    violated_edges: Tuple[Tuple[T, T], ...]
@@ -1,11 +1,18 @@
+import dataclasses as dc
 from collections.abc import Iterable
-from typing import Optional, TypeVar
+from itertools import islice
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
 
+from ranking.condorcet.condorcet_fixed_size_splits import fixed_size_splits
 from ranking.condorcet.condorcet_matrix import CondorcetMatrixBuilder
 from ranking.condorcet.condorcet_optimum import CondorcetOptimum
 from ranking.condorcet.condorcet_ranking_tiebreak import CondorcetRankingTieBreak
+from ranking.condorcet.condorcet_split_search import CondorcetSplitSearch
+from ranking.condorcet.condorcet_splits import CondorcetSplits
 from ranking.dtypes.segmented_ranking import SegmentedRanking, SegmentedRankingBuilder
+from ranking.dtypes.split import Split
 from ranking.tournament.tournament import Tournament
+from util.dtypes.bitmask import iter_bits
 from util.graphs.condensation import condense
 
 Side = TypeVar("Side")
@@ -37,6 +44,180 @@ def tournament_ranking(tournament: Tournament[Side], use_tiebreaker: bool = True
     return builder.build()
 
 
+def tournament_splits(
+    tournament: Tournament[Side], head_size: int, max_num: Optional[int] = None
+) -> CondorcetSplitSearch[Side]:
+    """
+    Low-cost splits of the tournament with a head of `head_size` sides, through the condensation of its
+    head-to-head digraph. No side beats a side of a strongly connected component that precedes its own. So the
+    heads that cost nothing are exactly the order ideals of the condensation: sets of whole components that hold
+    the predecessors of each of them, whichever of the mutually unordered components they take. Sides without a
+    decisive head-to-head are unordered components of their own.
+
+    If an ideal has `head_size` sides, the splits are these ideals, which are optimal, with a lower bound of zero.
+    Otherwise, the heads of an ideal plus one cut component, split by `fixed_size_splits` on its own matrix, are
+    the starts of a `CondorcetSplitSearch` on the whole tournament. That search may move sides ahead of their
+    components, and bounds the optimal cost from below. Ties can be very many in sparse tournaments; if `max_num`
+    is given, return at most that many of the splits.
+    """
+    digraph = tournament.h2h_digraph()
+    condensed = condense(digraph)
+    components = list(condensed.topo_sort.order)
+    component_idxs = {component: idx for idx, component in enumerate(components)}
+    segments = [list(component.nodes()) for component in components]
+    successors: List[List[int]] = [
+        [component_idxs[successor] for successor in condensed.reduced_digraph.neighbours(component)]
+        for component in components
+    ]
+    undecided = sorted((side for side in tournament.sides if not digraph.has_node(side)), key=str)
+    segments.extend([side] for side in undecided)
+    successors.extend([] for _ in undecided)
+    if not 0 <= head_size <= len(tournament.sides):
+        raise ValueError(f"head size {head_size} out of range for {len(tournament.sides)}")
+
+    search = _IdealSearch[Side](tournament, segments, successors, head_size)
+    cost, choices = search.optimum(max_num)
+    splits = islice((split for choice in choices for split in search.splits(choice)), max_num)
+    if cost == 0:
+        return CondorcetSplitSearch[Side](CondorcetSplits[Side](cost, frozenset(splits)), cost)
+    heads = [split.head for split in splits]
+    return CondorcetSplitSearch[Side].of(_make_condorcet_matrix(tournament), head_size, heads=heads)
+
+
+@dc.dataclass(frozen=True)
+class _Choice:
+    # The components forced into and out of the head, as bitmasks, and the component that is cut, with the number
+    # of its sides that go to the head.
+    forced_in: int
+    forced_out: int
+    cut_idx: Optional[int]
+    num_cut: int
+
+
+class _IdealSearch(Generic[Side]):
+    # Search over the order ideals of the condensation, with the components indexed in topological order and sets
+    # of them as int bitmasks. Only the components of several sides constrain the sizes of the ideals: once it is
+    # fixed which of them are in, the single-side components can be added one at a time in topological order, so
+    # the sizes in between the forced-in and the not forced-out components are all attained. The search is thus
+    # exponential only in the components of several sides, which are few in sparse tournaments.
+
+    def __init__(
+        self, tournament: Tournament[Side], segments: List[List[Side]], successors: List[List[int]], head_size: int
+    ):
+        self.tournament = tournament
+        self.segments = segments
+        self.head_size = head_size
+        num_components = len(segments)
+        # Reachability, both including the component itself.
+        self.descendants = [1 << idx for idx in range(num_components)]
+        for idx in reversed(range(num_components)):
+            for successor in successors[idx]:
+                self.descendants[idx] |= self.descendants[successor]
+        self.ancestors = [1 << idx for idx in range(num_components)]
+        for idx in range(num_components):
+            for successor in successors[idx]:
+                self.ancestors[successor] |= self.ancestors[idx]
+        self.tangles = [idx for idx, segment in enumerate(segments) if len(segment) > 1]
+        self.tangles_mask = sum(1 << idx for idx in self.tangles)
+        self.cuts: Dict[Tuple[int, int], CondorcetSplits[Side]] = {}
+
+    def optimum(self, max_num: Optional[int] = None) -> Tuple[int, List[_Choice]]:
+        # Whole ideals cost nothing, and each choice of them yields at least one split, so the walk stops at
+        # `max_num` of them. Cutting a strongly connected component always costs something, so the cuts met on
+        # the way are only priced if no ideal has the head size.
+        num_sides = len(self.tournament.sides)
+        choices: List[_Choice] = []
+        cut_choices: List[_Choice] = []
+        for forced_in, forced_out in self._tangle_ideals():
+            ideal_max = num_sides - self._size(forced_out)
+            if self._size(forced_in) <= self.head_size <= ideal_max:
+                choices.append(_Choice(forced_in, forced_out, None, 0))
+                if max_num is not None and len(choices) >= max_num:
+                    break
+            if choices:
+                continue
+            for idx in self.tangles:
+                if forced_out >> idx & 1 and not self.ancestors[idx] & self.tangles_mask & forced_out & ~(1 << idx):
+                    ideal_in = forced_in | self.ancestors[idx] & ~(1 << idx)
+                    for num_cut in range(1, len(self.segments[idx])):
+                        if self._size(ideal_in) <= self.head_size - num_cut <= ideal_max:
+                            cut_choices.append(_Choice(ideal_in, forced_out, idx, num_cut))
+        if choices:
+            return 0, choices
+        best_cost = min(self._cut(choice.cut_idx, choice.num_cut).cost for choice in cut_choices)
+        return best_cost, [
+            choice for choice in cut_choices if self._cut(choice.cut_idx, choice.num_cut).cost == best_cost
+        ]
+
+    def splits(self, choice: _Choice) -> Iterator[Split[Side]]:
+        cuts = [None] if choice.cut_idx is None else list(self._cut(choice.cut_idx, choice.num_cut))
+        for ideal in self._ideals(choice.forced_in, choice.forced_out, self.head_size - choice.num_cut):
+            head = [side for idx in iter_bits(ideal) for side in self.segments[idx]]
+            tail = [
+                side
+                for idx, segment in enumerate(self.segments)
+                if not ideal >> idx & 1 and idx != choice.cut_idx
+                for side in segment
+            ]
+            for cut in cuts:
+                if cut is None:
+                    yield Split[Side].of(head, tail)
+                else:
+                    yield Split[Side].of(head + list(cut.head), tail + list(cut.tail))
+
+    def _tangle_ideals(self) -> Iterator[Tuple[int, int]]:
+        # The down-closed sets of components of several sides, as the components that they force into and out of
+        # the head: their ancestors, and the descendants of the others. Both only grow along the walk, so it stops
+        # where the head size can no longer be met, even with a cut component.
+        num_sides = len(self.tournament.sides)
+        max_cut = max((len(self.segments[idx]) - 1 for idx in self.tangles), default=0)
+        stack = [(0, 0, 0)]
+        while stack:
+            pos, forced_in, forced_out = stack.pop()
+            if self._size(forced_in) > self.head_size or num_sides - self._size(forced_out) + max_cut < self.head_size:
+                continue
+            if pos == len(self.tangles):
+                yield forced_in, forced_out
+                continue
+            idx = self.tangles[pos]
+            if not forced_out >> idx & 1:
+                stack.append((pos + 1, forced_in | self.ancestors[idx], forced_out))
+            if not forced_in >> idx & 1:
+                stack.append((pos + 1, forced_in, forced_out | self.descendants[idx]))
+
+    def _ideals(self, forced_in: int, forced_out: int, size: int) -> Iterator[int]:
+        # The ideals of the given size between the forced components, by a walk over the free single-side
+        # components in topological order. A branch is only taken if its size is still attainable.
+        free = [idx for idx in range(len(self.segments)) if not (forced_in | forced_out) >> idx & 1]
+        stack = [(0, forced_in, forced_out)]
+        while stack:
+            pos, ideal, blocked = stack.pop()
+            missing = size - self._size(ideal)
+            available = sum(1 for idx in free[pos:] if not blocked >> idx & 1)
+            if not 0 <= missing <= available:
+                continue
+            if missing == 0:
+                yield ideal
+                continue
+            idx = free[pos]
+            if not blocked >> idx & 1:
+                stack.append((pos + 1, ideal, blocked | self.descendants[idx]))
+                stack.append((pos + 1, ideal | (1 << idx), blocked))
+            else:
+                stack.append((pos + 1, ideal, blocked))
+
+    def _size(self, components: int) -> int:
+        return components.bit_count() + sum(
+            len(self.segments[idx]) - 1 for idx in self.tangles if components >> idx & 1
+        )
+
+    def _cut(self, idx: int, num_head: int) -> CondorcetSplits[Side]:
+        key = (idx, num_head)
+        if key not in self.cuts:
+            self.cuts[key] = fixed_size_splits(_make_condorcet_matrix(self.tournament, self.segments[idx]), num_head)
+        return self.cuts[key]
+
+
 def _make_condorcet_matrix(tournament: Tournament[Side], sides: Optional[Iterable[Side]] = None):
     if sides is None:
         sides = tournament.sides
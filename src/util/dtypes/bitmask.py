@@ -1,4 +1,9 @@
-from typing import Iterable
+import math
+from typing import Iterable, List, Optional, TypeVar
+
+import numpy as np
+
+Mask = TypeVar("Mask", int, np.ndarray)
 
 
 def iter_bits(mask: int) -> Iterable[int]:
@@ -8,4 +13,99 @@ def iter_bits(mask: int) -> Iterable[int]:
         if mask & (1 << b):
             yield b
         b += 1
-        
\ No newline at end of file
+
+
+def drop_bit(mask: Mask, bit: int) -> Mask:
+    """
+    Remove the bit from the mask and shift all higher bits down by one position. Works
+    on a single int as well as elementwise on an integer numpy array.
+    """
+    low = mask & ((1 << bit) - 1)
+    high = (mask >> (bit + 1)) << bit
+    return low | high
+
+
+def popcounts(num_bits: int) -> np.ndarray:
+    """
+    Array of length `2**num_bits` holding the number of set bits of each index.
+    """
+    counts = np.zeros(1 << num_bits, dtype=np.uint8)
+    for bit in range(num_bits):
+        counts[1 << bit : 2 << bit] = counts[: 1 << bit] + 1
+    return counts
+
+
+def popcount_layers(num_bits: int) -> List[np.ndarray]:
+    """
+    All masks of `num_bits` bits, grouped by their number of set bits. Entry `k` of the
+    list is the ascending array of the masks with exactly `k` bits set.
+    """
+    counts = popcounts(num_bits)
+    masks = np.argsort(counts, kind="stable")
+    boundaries = np.cumsum(np.bincount(counts, minlength=num_bits + 1))[:-1]
+    return np.split(masks, boundaries)
+
+
+def binomials(num_bits: int) -> np.ndarray:
+    """
+    Table of binomial coefficients as an int64 array: entry `[n, k]` is
+    `comb(n, k)`, for `0 <= n <= num_bits` and `0 <= k <= num_bits + 1`.
+    """
+    table = np.zeros((num_bits + 1, num_bits + 2), dtype=np.int64)
+    for n in range(num_bits + 1):
+        table[n, : n + 1] = [math.comb(n, k) for k in range(n + 1)]
+    return table
+
+
+def combinations_of(
+    num_bits: int, num_set: int, start: int = 0, stop: Optional[int] = None
+) -> np.ndarray:
+    """
+    Ascending array of all masks of `num_bits` bits with exactly `num_set` bits set.
+    The index of a mask in this array is its rank in the combinatorial number system;
+    see `combination_ranks()`. If `start` or `stop` are given, only return the masks
+    with rank in `range(start, stop)`, so that large sets can be walked in chunks, in
+    the same order as Gosper's hack.
+    """
+    table = binomials(num_bits)
+    total = table[num_bits, num_set]
+    stop = total if stop is None else min(stop, total)
+    ranks = np.arange(min(start, stop), stop, dtype=np.int64)
+    masks = np.zeros(len(ranks), dtype=np.int64)
+    for t in reversed(range(1, num_set + 1)):
+        # The t-th lowest bit is the largest position p with comb(p, t) <= rank.
+        column = table[:num_bits, t]
+        bits = np.searchsorted(column, ranks, side="right") - 1
+        ranks -= column[bits]
+        masks |= np.left_shift(1, bits, dtype=np.int64)
+    return masks
+
+
+def deposit_bits(masks: np.ndarray, positions: Iterable[int]) -> np.ndarray:
+    """
+    Scatter the low bits of each mask to the given bit positions: bit `j` of a mask
+    becomes bit `positions[j]` of the result. Ascending positions preserve the order of
+    the masks.
+    """
+    masks = np.asarray(masks, dtype=np.int64)
+    deposited = np.zeros(masks.shape, dtype=np.int64)
+    for bit, position in enumerate(positions):
+        deposited |= ((masks >> bit) & 1) << position
+    return deposited
+
+
+def combination_ranks(masks: np.ndarray, num_bits: int) -> np.ndarray:
+    """
+    Rank of each mask among the masks with the same number of set bits, in the
+    combinatorial number system: the sum of `comb(p, t)` over the set bits, where `p`
+    is the position of a bit and `t` its 1-based index among the set bits.
+    """
+    table = binomials(num_bits)
+    masks = np.asarray(masks, dtype=np.int64)
+    ranks = np.zeros(masks.shape, dtype=np.int64)
+    seen = np.zeros(masks.shape, dtype=np.int64)
+    for bit in range(num_bits):
+        has_bit = (masks >> bit) & 1
+        seen += has_bit
+        ranks += has_bit * table[bit, seen]
+    return ranks
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import dataclasses as dc
+from typing import Dict, Generic, List, Tuple, TypeVar
+
+from util.graphs.digraph import DiGraph
+
+Node = TypeVar("Node")
+
+
+@dc.dataclass(frozen=True)
+class GreedyFas(Generic[Node]):
+    """
+    Ordering of the nodes of a DiGraph with few backward edges, by the greedy
+    feedback arc set heuristic of Eades, Lin and Smyth.
+
+    Sinks are repeatedly moved to the back of the ordering and sources to the front.
+    When neither is left, the node with the largest surplus of out-degree over
+    in-degree goes to the front. The `back_edges` are the edges that point from a node
+    to an earlier node; removing them leaves the digraph acyclic, with `order` as a
+    topological order. Nodes are kept in buckets by their current degree class, so the
+    ordering takes O(V + E) time.
+    """
+
+    order: Tuple[Node, ...]
+    back_edges: Tuple[Tuple[Node, Node], ...]
+
+    @classmethod
+    def of(cls, digraph: DiGraph[Node]) -> GreedyFas[Node]:
+        buckets = _DegreeBuckets[Node].of(digraph)
+        head: List[Node] = []
+        tail: List[Node] = []
+        while buckets.remaining:
+            if buckets.sinks:
+                tail.append(buckets.pop(buckets.sinks))
+            elif buckets.sources:
+                head.append(buckets.pop(buckets.sources))
+            else:
+                head.append(buckets.pop(buckets.max_surplus_bucket()))
+        order = tuple(head + tail[::-1])
+
+        position = {node: idx for idx, node in enumerate(order)}
+        back_edges = tuple(
+            (source, sink)
+            for source in order
+            for sink in digraph.neighbours(source)
+            if position[sink] < position[source]
+        )
+        return cls(order, back_edges)
+
+
+class _DegreeBuckets(Generic[Node]):
+    # The remaining nodes, by class: sinks, sources that are not sinks, and the
+    # others by out-degree minus in-degree. Buckets are insertion-ordered dicts used
+    # as sets, so each node moves between buckets in O(1).
+
+    def __init__(self, successors: Dict[Node, List[Node]]):
+        self.successors = successors
+        self.predecessors: Dict[Node, List[Node]] = {node: [] for node in successors}
+        for source, sinks in successors.items():
+            for sink in sinks:
+                self.predecessors[sink].append(source)
+        self.out_degrees = {node: len(sinks) for node, sinks in successors.items()}
+        self.in_degrees = {node: len(srcs) for node, srcs in self.predecessors.items()}
+        self.sinks: Dict[Node, None] = {}
+        self.sources: Dict[Node, None] = {}
+        self.surpluses: Dict[int, Dict[Node, None]] = {}
+        self.max_surplus = 0
+        self.remaining = len(successors)
+        for node in successors:
+            self._bucket(node)[node] = None
+
+    def pop(self, bucket: Dict[Node, None]) -> Node:
+        node = next(iter(bucket))
+        del bucket[node]
+        self.remaining -= 1
+        self.out_degrees[node] = self.in_degrees[node] = -1
+        for sink in self.successors[node]:
+            if self.in_degrees[sink] >= 0:
+                del self._bucket(sink)[sink]
+                self.in_degrees[sink] -= 1
+                self._bucket(sink)[sink] = None
+        for source in self.predecessors[node]:
+            if self.out_degrees[source] >= 0:
+                del self._bucket(source)[source]
+                self.out_degrees[source] -= 1
+                self._bucket(source)[source] = None
+        return node
+
+    def max_surplus_bucket(self) -> Dict[Node, None]:
+        while not self.surpluses.get(self.max_surplus):
+            self.max_surplus -= 1
+        return self.surpluses[self.max_surplus]
+
+    def _bucket(self, node: Node) -> Dict[Node, None]:
+        if self.out_degrees[node] == 0:
+            return self.sinks
+        if self.in_degrees[node] == 0:
+            return self.sources
+        surplus = self.out_degrees[node] - self.in_degrees[node]
+        self.max_surplus = max(self.max_surplus, surplus)
+        return self.surpluses.setdefault(surplus, {})
+
+    @classmethod
+    def of(cls, digraph: DiGraph[Node]) -> _DegreeBuckets[Node]:
+        return cls(
+            {
+                node: [sink for sink in digraph.neighbours(node) if sink != node]
+                for node in digraph.nodes()
+            }
+        )
@@ -0,0 +1,32 @@
+"""
+Run a function over contiguous slices of a range, in a pool of threads.
+
+Intended for bulk numpy work on disjoint parts of shared arrays: numpy releases the
+GIL inside its vectorized loops, so the slices progress in parallel without copying
+the arrays into worker processes.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+
+
+def for_each_slice(
+    fn: Callable[[slice], None], length: int, workers: int, min_slice: int = 1
+) -> None:
+    """
+    Call `fn` once for each of at most `workers` contiguous slices that cover
+    `range(length)`. Slices are at least `min_slice` long, so small ranges run in
+    the calling thread. Exceptions raised by `fn` are propagated.
+    """
+    num_slices = max(1, min(workers, length // max(min_slice, 1)))
+    if num_slices == 1:
+        fn(slice(0, length))
+        return
+    bounds = np.linspace(0, length, num_slices + 1).astype(int)
+    slices = [slice(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    with ThreadPoolExecutor(max_workers=num_slices) as pool:
+        list(pool.map(fn, slices))
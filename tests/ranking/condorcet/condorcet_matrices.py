@@ -0,0 +1,40 @@
+"""
+Condorcet matrices shared by the tests of the Condorcet solvers.
+"""
+
+import numpy as np
+
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix, CondorcetMatrixBuilder
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+
+def make_matrix(n: int, seed: int, max_entry: int = 2) -> CondorcetMatrix[int]:
+    # Random anti-symmetric matrix with entries in [-max_entry, max_entry].
+    rng = np.random.default_rng(seed)
+    mx = np.triu(rng.integers(-max_entry, max_entry + 1, size=(n, n)), 1)
+    return CondorcetMatrix[int](tuple(range(n)), FrozenNdArray(mx - mx.T))
+
+
+def make_matrix_nearly_ordered(n: int, seed: int) -> CondorcetMatrix[int]:
+    # Item i mostly beats item j for i < j.
+    rng = np.random.default_rng(seed)
+    mx = np.triu(np.full((n, n), 3) + rng.integers(-4, 2, size=(n, n)), 1)
+    return CondorcetMatrix[int](tuple(range(n)), FrozenNdArray(mx - mx.T))
+
+
+def make_matrix_transitive(order) -> CondorcetMatrix[int]:
+    # Item order[i] beats order[j] for i < j.
+    positions = np.argsort(order)
+    mx = np.sign(positions[np.newaxis, :] - positions[:, np.newaxis])
+    return CondorcetMatrix[int](tuple(range(len(order))), FrozenNdArray(mx))
+
+
+def make_matrix_5_cycle() -> CondorcetMatrix[str]:
+    builder = CondorcetMatrixBuilder[str](("A", "B", "C", "D", "E"))
+    for lhs, rhs in [("A", "B"), ("A", "C"), ("B", "C"), ("B", "D"), ("C", "D")]:
+        builder.add_entry(lhs, rhs, 1)
+    for lhs, rhs in [("C", "E"), ("D", "E")]:
+        builder.add_entry(lhs, rhs, 1)
+    for lhs, rhs in [("A", "D"), ("A", "E"), ("B", "E")]:
+        builder.add_entry(lhs, rhs, -1)
+    return builder.build()
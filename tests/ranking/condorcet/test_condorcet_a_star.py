@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from condorcet_matrices import (
+    make_matrix,
+    make_matrix_5_cycle,
+    make_matrix_nearly_ordered,
+)
+
+from ranking.condorcet.condorcet_a_star import CondorcetAStar
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 6, 9])
+def test_matches_condorcet_optimum(n: int):
+    matrix = make_matrix(n, seed=n)
+    solver = CondorcetAStar[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert solver.optimal_cost() == optimum.costs.optimal_cost()
+    assert solver.rankings() == optimum.rankings()
+
+
+def test_matches_condorcet_optimum_fractional():
+    matrix = make_matrix(7, seed=3)
+    matrix = CondorcetMatrix[int](matrix.items, FrozenNdArray(matrix.mx / 4))
+    solver = CondorcetAStar[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert np.isclose(solver.optimal_cost(), optimum.costs.optimal_cost())
+    assert set(solver.rankings()) == set(optimum.rankings())
+
+
+def test_nearly_ordered_explores_few_states():
+    matrix = make_matrix_nearly_ordered(14, seed=0)
+    solver = CondorcetAStar[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert solver.rankings() == optimum.rankings()
+    assert solver.num_explored < 2**14 // 10
+
+
+def test_cyclic_matrix_explores_few_states():
+    # Without a lower bound, the search would reach thousands of states here.
+    matrix = make_matrix(14, seed=0)
+    solver = CondorcetAStar[int].of(matrix)
+
+    assert solver.rankings() == CondorcetOptimum[int].of(matrix).rankings()
+    assert solver.num_explored < 2**14 // 5
+
+
+def test_rankings_5_cycle():
+    solver = CondorcetAStar[str].of(make_matrix_5_cycle())
+    assert solver.optimal_cost() == 3
+    assert len(solver.rankings()) == 5
+
+    rankings = solver.rankings(max_num=2)
+    assert len(rankings) == 2
+    assert rankings.is_truncated
+    assert set(rankings) <= set(solver.rankings())
+    assert not solver.rankings(max_num=5).is_truncated
@@ -0,0 +1,40 @@
+from itertools import islice, permutations
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_best_first import best_first_permutations
+from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
+
+
+def permutation_cost(permutation, violation_mx) -> int:
+    return sum(
+        violation_mx[lhs, rhs]
+        for idx, lhs in enumerate(permutation)
+        for rhs in permutation[idx + 1 :]
+    )
+
+
+def test_all_permutations_in_cost_order():
+    matrix = make_matrix(5, seed=11, max_entry=3)
+    costs = CondorcetSubsetCosts[int].of(matrix)
+    result = list(best_first_permutations(costs))
+
+    assert len(result) == 120
+    assert {permutation for _, permutation in result} == set(permutations(range(5)))
+    for cost, permutation in result:
+        assert cost == permutation_cost(permutation, matrix.violation_mx)
+    assert [cost for cost, _ in result] == sorted(cost for cost, _ in result)
+
+
+def test_starts_at_optimum():
+    matrix = make_matrix(9, seed=5, max_entry=3)
+    costs = CondorcetSubsetCosts[int].of(matrix)
+    cost, _ = next(iter(best_first_permutations(costs)))
+    assert cost == costs.optimal_cost()
+    assert len(list(islice(best_first_permutations(costs), 50))) == 50
+
+
+def test_empty():
+    matrix = make_matrix(0, seed=0, max_entry=3)
+    costs = CondorcetSubsetCosts[int].of(matrix)
+    assert list(best_first_permutations(costs)) == [(0, ())]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from condorcet_matrices import make_matrix, make_matrix_5_cycle
+
+from ranking.condorcet.condorcet_branch_and_bound import CondorcetBranchAndBound
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 6, 9])
+def test_matches_condorcet_optimum(n: int):
+    matrix = make_matrix(n, seed=n)
+    solver = CondorcetBranchAndBound[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert solver.rankings == optimum.rankings()
+    assert solver.is_optimal
+    assert solver.gap == 0
+
+
+def test_matches_condorcet_optimum_fractional():
+    matrix = make_matrix(7, seed=3)
+    matrix = CondorcetMatrix[int](matrix.items, FrozenNdArray(matrix.mx / 4))
+    solver = CondorcetBranchAndBound[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix).rankings()
+
+    assert np.isclose(solver.rankings.cost, optimum.cost)
+    assert set(solver.rankings) == set(optimum)
+
+
+def test_max_num_5_cycle():
+    solver = CondorcetBranchAndBound[str].of(make_matrix_5_cycle(), max_num=2)
+    assert solver.rankings.cost == 3
+    assert len(solver.rankings) == 2
+    assert solver.rankings.is_truncated
+    assert solver.is_optimal
+    assert set(solver.rankings) <= set(CondorcetOptimum[str].of(make_matrix_5_cycle()).rankings())
+
+
+def test_interrupted_bounds_optimum():
+    matrix = make_matrix(14, seed=1)
+    solver = CondorcetBranchAndBound[int].of(matrix, max_num=1, max_nodes=50)
+    optimal_cost = CondorcetOptimum[int].of(matrix).costs.optimal_cost()
+
+    assert solver.num_nodes == 51
+    assert not solver.is_optimal
+    assert solver.rankings.is_truncated
+    assert solver.lower_bound <= optimal_cost <= solver.rankings.cost
+    assert solver.gap == solver.rankings.cost - solver.lower_bound > 0
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_clones import CondorcetClones, clone_groups
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+
+def make_matrix_with_clones(
+    sizes, seed: int, shuffle: bool = True
+) -> CondorcetMatrix[int]:
+    # Expand a random matrix over len(sizes) groups, with random entries between the
+    # members of a group. Only chains of members that happen to agree are clones.
+    rng = np.random.default_rng(seed)
+    base = np.triu(rng.integers(-2, 3, size=(len(sizes), len(sizes))), 1)
+    labels = np.repeat(np.arange(len(sizes)), sizes)
+    mx = (base - base.T)[np.ix_(labels, labels)]
+    inner = np.triu(rng.integers(-1, 2, size=(len(labels), len(labels))), 1)
+    same_group = labels[:, np.newaxis] == labels[np.newaxis, :]
+    mx[same_group] = (inner - inner.T)[same_group]
+    if shuffle:
+        perm = rng.permutation(len(labels))
+        mx = mx[np.ix_(perm, perm)]
+    return CondorcetMatrix[int](tuple(range(len(labels))), FrozenNdArray(mx))
+
+
+def test_clone_groups():
+    mx = np.array(
+        [
+            [0, 1, 2, -1],
+            [-1, 0, 2, -1],
+            [-2, -2, 0, 3],
+            [1, 1, -3, 0],
+        ]
+    )
+    matrix = CondorcetMatrix[str](("A", "B", "C", "D"), FrozenNdArray(mx))
+    assert clone_groups(matrix) == (("A", "B"), ("C",), ("D",))
+
+
+def test_clone_groups_chain():
+    matrix = make_matrix_blocks()
+    assert clone_groups(matrix) == ((0, 1, 2), (3, 4), (5,))
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_condorcet_optimum(seed: int):
+    matrix = make_matrix_with_clones([3, 2, 2, 1], seed=seed)
+    clones = CondorcetClones[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert clones.optimal_cost() == optimum.costs.optimal_cost()
+    assert clones.num_rankings() == optimum.num_rankings()
+    assert clones.rankings() == optimum.rankings()
+
+
+def test_without_clones_matches_condorcet_optimum():
+    matrix = make_matrix(7, seed=5)
+    clones = CondorcetClones[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert all(len(group) == 1 for group in clones.groups)
+    assert clones.optimal_cost() == optimum.costs.optimal_cost()
+    assert clones.num_rankings() == optimum.num_rankings()
+    assert clones.rankings() == optimum.rankings()
+    assert clones.rankings(max_num=2).is_truncated == (optimum.num_rankings() > 2)
+
+
+def test_rankings_truncated():
+    matrix = make_matrix_blocks()
+    clones = CondorcetClones[int].of(matrix)
+    assert clones.groups == ((0, 1, 2), (3, 4), (5,))
+    assert clones.num_rankings() == CondorcetOptimum[int].of(matrix).num_rankings()
+
+    rankings = clones.rankings(max_num=3)
+    assert len(rankings) == 3
+    assert rankings.is_truncated
+    assert set(rankings) <= set(clones.rankings())
+
+
+def make_matrix_blocks() -> CondorcetMatrix[int]:
+    # Groups {0, 1, 2}, {3, 4} and {5}, tied within each group.
+    labels = np.array([0, 0, 0, 1, 1, 2])
+    base = np.array([[0, 1, -2], [-1, 0, 1], [2, -1, 0]])
+    mx = base[np.ix_(labels, labels)]
+    return CondorcetMatrix[int](tuple(range(6)), FrozenNdArray(mx))
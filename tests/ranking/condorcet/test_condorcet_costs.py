@@ -1,10 +1,15 @@
 import numpy as np
+import pytest
 
 from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
-from ranking.condorcet.condorcet_matrix import CondorcetMatrixBuilder
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix, CondorcetMatrixBuilder
 
 
 def make_instance_5_complicated() -> CondorcetSubsetCosts[str]:
+    return CondorcetSubsetCosts[str].of(make_matrix_5_complicated())
+
+
+def make_matrix_5_complicated() -> CondorcetMatrix[str]:
     builder = CondorcetMatrixBuilder[str](("A", "B", "C", "D", "E"))
     builder.add_entry("A", "B", -4)
     builder.add_entry("A", "C", 2)
@@ -16,8 +21,7 @@ def make_instance_5_complicated() -> CondorcetSubsetCosts[str]:
     builder.add_entry("C", "D", -16)
     builder.add_entry("C", "E", 256)
     builder.add_entry("D", "E", -64)
-    matrix = builder.build()
-    return CondorcetSubsetCosts[str].of(matrix)
+    return builder.build()
 
 
 def test_items():
@@ -35,6 +39,30 @@ def test_split_costs():
     expected = np.array([0,3,516,515,384,385,772,769,48,50,532,530,416,416,772,768,72,67,76,67,200,193,76,65,56,50,28,18,168,160,12,0])
     assert np.array_equal(costs.split_costs, expected)
 
+
+
+def test_optimal_split_tails():
+    costs = make_instance_5_complicated()
+    expected = [(0, [0]), (3, [1]), (50, [9]), (28, [26]), (12, [30]), (0, [31])]
+    for tail_size, (expected_cost, expected_tails) in enumerate(expected):
+        cost, tails = costs.optimal_split_tails(tail_size)
+        assert cost == expected_cost
+        assert tails.tolist() == expected_tails
+    with pytest.raises(ValueError):
+        costs.optimal_split_tails(6)
+
+
+def test_optimal_split_tails_with_constraints():
+    costs = make_instance_5_complicated()
+    cost, tails = costs.optimal_split_tails(1, excluded=0b00001)
+    assert cost == 48
+    assert tails.tolist() == [8]
+    cost, tails = costs.optimal_split_tails(2, required=0b00100, excluded=0b00001)
+    assert cost == 200
+    assert tails.tolist() == [20]
+    with pytest.raises(ValueError):
+        costs.optimal_split_tails(1, required=0b00011)
+
     
 def test_mask_sizes():
     costs = make_instance_5_complicated()
@@ -65,9 +93,74 @@ def test_optimal_cost():
     assert costs.optimal_cost() == expected[-1]
 
 
+def test_tight_bits():
+    costs = make_instance_5_complicated()
+    for mask in range(1, 32):
+        expected = 0
+        for bit in range(5):
+            prev = mask ^ (1 << bit)
+            if mask & (1 << bit) and costs.optimal_cost(mask) == costs.optimal_cost(
+                prev
+            ) + costs.incremental_cost(bit, prev):
+                expected |= 1 << bit
+        assert costs.tight_bits(mask) == expected
+        for bit in range(5):
+            assert costs.is_tight(bit, mask) == bool(expected & (1 << bit))
+    assert costs.tight_bits(0) == 0
+
+
 def test_mask_to_items():
     costs = make_instance_5_complicated()
     assert costs.mask_to_items(0) == ()
     assert costs.mask_to_items(1) == ("A",)
     assert costs.mask_to_items(11) == ("A", "B", "D")
     assert costs.mask_to_items(31) == ("A", "B", "C", "D", "E")
+
+
+def test_incremental_cost_matches_direct_sums():
+    rng = np.random.default_rng(7)
+    items = tuple(range(8))
+    builder = CondorcetMatrixBuilder[int](items)
+    for lhs in items:
+        for rhs in items[lhs + 1 :]:
+            builder.add_entry(lhs, rhs, int(rng.integers(-5, 6)))
+    matrix = builder.build()
+    costs = CondorcetSubsetCosts[int].of(matrix)
+    violation_mx = matrix.violation_mx
+    for bit in items:
+        for mask in range(1 << len(items)):
+            if not mask & (1 << bit):
+                expected = sum(violation_mx[bit, u] for u in items if mask & (1 << u))
+                assert costs.incremental_cost(bit, mask) == expected
+
+
+def test_table_free_matches_table():
+    costs = make_instance_5_complicated()
+    matrix = make_matrix_5_complicated()
+    table_free = CondorcetSubsetCosts[str].of(matrix, table_free=True)
+    assert np.array_equal(table_free.split_costs, costs.split_costs)
+    assert np.array_equal(table_free.mask_sizes, costs.mask_sizes)
+    for mask in range(32):
+        assert table_free.optimal_cost(mask) == costs.optimal_cost(mask)
+        for bit in range(5):
+            if not mask & (1 << bit):
+                assert table_free.incremental_cost(bit, mask) == costs.incremental_cost(
+                    bit, mask
+                )
+
+
+def test_workers_match_single_thread():
+    rng = np.random.default_rng(3)
+    items = tuple(range(18))
+    builder = CondorcetMatrixBuilder[int](items)
+    for lhs in items:
+        for rhs in items[lhs + 1 :]:
+            builder.add_entry(lhs, rhs, int(rng.integers(-2, 3)))
+    matrix = builder.build()
+    serial = CondorcetSubsetCosts[int].of(matrix)
+    parallel = CondorcetSubsetCosts[int].of(matrix, workers=4)
+    assert parallel.optimal_cost() == serial.optimal_cost()
+    assert parallel.num_optimal_arrangements() == serial.num_optimal_arrangements()
+    for mask in rng.integers(0, 1 << 18, size=200):
+        assert parallel.optimal_cost(mask) == serial.optimal_cost(mask)
+        assert parallel.tight_bits(mask) == serial.tight_bits(mask)
@@ -0,0 +1,43 @@
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_fixed_size_splits import fixed_size_splits
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import split_cost
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 9])
+def test_matches_condorcet_optimum(n: int):
+    matrix = make_matrix(n, seed=n)
+    optimum = CondorcetOptimum[int].of(matrix)
+    for head_size in range(n + 1):
+        assert fixed_size_splits(matrix, head_size, chunk_size=5) == optimum.splits(
+            head_size
+        )
+
+
+def test_pinned_items_match_condorcet_optimum():
+    matrix = make_matrix(9, seed=4)
+    optimum = CondorcetOptimum[int].of(matrix)
+    for head_size in range(2, 8):
+        pins = dict(must_head=[0, 5], must_tail=[3])
+        assert fixed_size_splits(
+            matrix, head_size, chunk_size=5, **pins
+        ) == optimum.splits(head_size, **pins)
+    with pytest.raises(ValueError):
+        fixed_size_splits(matrix, 1, must_head=[0, 5])
+
+
+def test_split_costs_beyond_subset_tables():
+    matrix = make_matrix(26, seed=1)
+    splits = fixed_size_splits(matrix, 3)
+    assert len(splits) >= 1
+    for split in splits:
+        assert len(split.head) == 3
+        assert split_cost(split, matrix) == splits.cost
+
+
+def test_head_size_out_of_range():
+    with pytest.raises(ValueError):
+        fixed_size_splits(make_matrix(3, seed=0), 4)
@@ -0,0 +1,51 @@
+import pytest
+
+from condorcet_matrices import make_matrix, make_matrix_nearly_ordered
+
+from ranking.condorcet.condorcet_ideal_costs import CondorcetIdealCosts
+from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 8])
+def test_without_precedences_matches_subset_costs(n: int):
+    matrix = make_matrix(n, seed=n)
+    ideal_costs = CondorcetIdealCosts[int].of(matrix, derive_precedences=False)
+    subset_costs = CondorcetSubsetCosts[int].of(matrix)
+
+    assert ideal_costs.num_ideals == 2**n
+    for mask in range(2**n):
+        assert ideal_costs.optimal_cost(mask) == subset_costs.optimal_cost(mask)
+        assert ideal_costs.tight_bits(mask) == subset_costs.tight_bits(mask)
+        assert ideal_costs.num_optimal_arrangements(
+            mask
+        ) == subset_costs.num_optimal_arrangements(mask)
+
+
+def test_derived_precedences_shrink_lattice():
+    matrix = make_matrix_nearly_ordered(14, seed=0)
+    ideal_costs = CondorcetIdealCosts[int].of(matrix)
+    subset_costs = CondorcetSubsetCosts[int].of(matrix)
+
+    assert ideal_costs.num_ideals < 2**14 // 2
+    assert ideal_costs.optimal_cost() == subset_costs.optimal_cost()
+    assert ideal_costs.num_optimal_arrangements() == subset_costs.num_optimal_arrangements()
+
+
+def test_user_precedences():
+    matrix = make_matrix(6, seed=2)
+    ideal_costs = CondorcetIdealCosts[int].of(matrix, [(5, 0), (0, 3)])
+    full = 2**6 - 1
+
+    assert ideal_costs.optimal_cost() >= CondorcetSubsetCosts[int].of(matrix).optimal_cost()
+    assert not ideal_costs.is_tight(0, full)
+    assert not ideal_costs.is_tight(3, full)
+    with pytest.raises(KeyError):
+        ideal_costs.optimal_cost(full ^ 1)
+
+
+def test_invalid_precedences():
+    matrix = make_matrix(4, seed=0)
+    with pytest.raises(ValueError):
+        CondorcetIdealCosts[int].of(matrix, [(0, 1), (1, 2), (2, 0)])
+    with pytest.raises(ValueError):
+        CondorcetIdealCosts[int].of(matrix, [(0, 7)])
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+    CondorcetIncrementalCostTable,
+    LayerMinimum,
+    count_dtype,
+)
+
+
+def make_violation_mx(n: int, seed: int, fractional: bool = False) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    if fractional:
+        mx = rng.normal(size=(n, n))
+    else:
+        mx = rng.integers(-9, 10, size=(n, n))
+    mx = np.triu(mx, 1)
+    return np.maximum(-(mx - mx.T), 0)
+
+
+def direct_costs(violation_mx: np.ndarray, bit: int, masks: np.ndarray) -> np.ndarray:
+    n = len(violation_mx)
+    members = (masks[:, None] >> np.arange(n)) & 1
+    return members @ violation_mx[bit]
+
+
+@pytest.mark.parametrize(
+    "backend", [CondorcetIncrementalCostTable, CondorcetIncrementalCostLookup]
+)
+@pytest.mark.parametrize("n", [1, 2, 5, 11])
+def test_costs(backend, n: int):
+    violation_mx = make_violation_mx(n, seed=n)
+    costs = backend.of(violation_mx)
+    masks = np.arange(1 << n)
+    for bit in range(n):
+        valid = masks[(masks >> bit) & 1 == 0]
+        expected = direct_costs(violation_mx, bit, valid)
+        assert np.array_equal(costs.costs(bit, valid), expected)
+
+
+@pytest.mark.parametrize(
+    "backend", [CondorcetIncrementalCostTable, CondorcetIncrementalCostLookup]
+)
+def test_costs_fractional(backend):
+    violation_mx = make_violation_mx(6, seed=3, fractional=True)
+    costs = backend.of(violation_mx)
+    assert costs.dtype == np.float64
+    masks = np.arange(1 << 6)
+    for bit in range(6):
+        valid = masks[(masks >> bit) & 1 == 0]
+        expected = direct_costs(violation_mx, bit, valid)
+        assert np.allclose(costs.costs(bit, valid), expected)
+
+
+@pytest.mark.parametrize(
+    "scale,dtype", [(1, np.int16), (10_000, np.int32), (10**9, np.int64)]
+)
+def test_table_dtype(scale: int, dtype):
+    violation_mx = make_violation_mx(5, seed=0) * scale
+    assert CondorcetIncrementalCostTable.of(violation_mx).dtype == dtype
+    assert CondorcetIncrementalCostLookup.of(violation_mx).dtype == dtype
+
+
+def test_table_shape():
+    costs = CondorcetIncrementalCostTable.of(make_violation_mx(6, seed=0))
+    assert costs.table.shape == (6, 32)
+
+
+def test_layer_minimum():
+    minimum = LayerMinimum.of(3, np.int64, np.int64, count_dtype(3))
+    minimum.relax(np.array([0, 1]), np.array([5, 2]), 1 << 0, np.array([1, 2]))
+    minimum.relax(np.array([0, 1, 2]), np.array([5, 3, 4]), 1 << 1, np.array([3, 1, 1]))
+    minimum.relax(np.array([0]), np.array([4]), 1 << 2, np.array([7]))
+    assert minimum.best.tolist() == [4, 2, 4]
+    assert minimum.tight.tolist() == [0b100, 0b001, 0b010]
+    assert minimum.counts.tolist() == [7, 2, 1]
+
+
+def test_layer_minimum_floats_tie_up_to_rounding():
+    minimum = LayerMinimum.of(1, np.float64, np.int64, count_dtype(3))
+    minimum.relax(np.array([0]), np.array([0.3]), 1 << 0, np.array([1]))
+    minimum.relax(np.array([0]), np.array([0.1 + 0.2]), 1 << 1, np.array([2]))
+    assert minimum.tight.tolist() == [0b11]
+    assert minimum.counts.tolist() == [3]
+
+
+def test_count_dtype():
+    assert count_dtype(20) == np.int64
+    assert count_dtype(21) is object
@@ -0,0 +1,43 @@
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_insertion_search import CondorcetInsertionSearch
+from ranking.condorcet.condorcet_utils import ranking_cost
+from ranking.dtypes.ranking import Ranking
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 8, 30])
+def test_local_optimum(n: int):
+    matrix = make_matrix(n, seed=n)
+    search = CondorcetInsertionSearch[int].of(matrix)
+
+    assert search.is_local_optimum
+    assert search.best.cost == ranking_cost(search.best.ranking, matrix)
+    assert search.trace[-1][1] == search.best.cost
+    costs = [cost for _, cost in search.trace]
+    assert all(lhs > rhs for lhs, rhs in zip(costs, costs[1:]))
+
+
+def test_from_initial_ranking():
+    matrix = make_matrix(20, seed=1)
+    initial = Ranking[int].of(range(19, -1, -1))
+    search = CondorcetInsertionSearch[int].of(matrix, initial=initial, seed=3)
+
+    assert search.trace[0] == (0, ranking_cost(initial, matrix))
+    assert search.best.cost < search.trace[0][1]
+    assert search == CondorcetInsertionSearch[int].of(matrix, initial=initial, seed=3)
+
+
+def test_iteration_budget():
+    matrix = make_matrix(40, seed=2)
+    search = CondorcetInsertionSearch[int].of(matrix, max_iterations=5)
+
+    assert search.num_iterations == 5
+    assert not search.is_local_optimum
+    assert search.best.cost == ranking_cost(search.best.ranking, matrix)
+
+
+def test_invalid_initial_ranking():
+    with pytest.raises(ValueError):
+        CondorcetInsertionSearch[int].of(make_matrix(3, seed=0), Ranking[int].of([0, 1]))
@@ -0,0 +1,33 @@
+import pytest
+
+from condorcet_matrices import make_matrix, make_matrix_transitive
+
+from ranking.condorcet.condorcet_kwik_sort import kwik_sort_ranking
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import ranking_cost
+from ranking.dtypes.ranking import Ranking
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 9])
+def test_cost_matches_ranking_cost(n: int):
+    matrix = make_matrix(n, seed=n)
+    costed = kwik_sort_ranking(matrix)
+
+    assert sorted(costed.ranking.items) == list(range(n))
+    assert costed.cost == ranking_cost(costed.ranking, matrix)
+    assert costed.cost >= CondorcetOptimum[int].of(matrix).costs.optimal_cost()
+
+
+def test_sorts_transitive_matrix():
+    order = [7, 2, 9, 0, 4, 1, 8, 3, 6, 5]
+    costed = kwik_sort_ranking(make_matrix_transitive(order), num_restarts=1)
+    assert costed.ranking == Ranking[int].of(order)
+    assert costed.cost == 0
+
+
+def test_restarts_reproducible_across_workers():
+    matrix = make_matrix(40, seed=3)
+    single = kwik_sort_ranking(matrix, num_restarts=6, seed=5)
+
+    assert single.cost <= kwik_sort_ranking(matrix, num_restarts=1, seed=5).cost
+    assert kwik_sort_ranking(matrix, num_restarts=6, seed=5, workers=2) == single
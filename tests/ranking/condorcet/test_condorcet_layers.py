@@ -0,0 +1,39 @@
+import numpy as np
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_incremental_costs import (
+    CondorcetIncrementalCostLookup,
+)
+from ranking.condorcet.condorcet_layers import stream_layers
+from ranking.condorcet.condorcet_subset_costs import CondorcetSubsetCosts
+
+
+def test_layers_match_subset_costs():
+    matrix = make_matrix(9, seed=4, max_entry=9)
+    costs = CondorcetSubsetCosts[int].of(matrix)
+    incremental_costs = CondorcetIncrementalCostLookup.of(matrix.violation_mx)
+
+    layers = list(stream_layers(incremental_costs, 9))
+    assert [layer.size for layer in layers] == list(range(10))
+    for layer in layers:
+        assert np.all(np.diff(layer.masks) > 0)
+        for mask, cost in zip(layer.masks, layer.costs):
+            assert bin(int(mask)).count("1") == layer.size
+            assert costs.optimal_cost(int(mask)) == cost
+
+
+def test_layer_cost_lookup():
+    matrix = make_matrix(6, seed=1, max_entry=9)
+    incremental_costs = CondorcetIncrementalCostLookup.of(matrix.violation_mx)
+    layer = list(stream_layers(incremental_costs, 6))[3]
+    shuffled = layer.masks[::-1]
+    assert np.array_equal(layer.cost(shuffled), layer.costs[::-1])
+
+
+def test_empty_matrix():
+    incremental_costs = CondorcetIncrementalCostLookup.of(np.zeros((0, 0), dtype=int))
+    layers = list(stream_layers(incremental_costs, 0))
+    assert len(layers) == 1
+    assert list(layers[0].masks) == [0]
+    assert list(layers[0].costs) == [0]
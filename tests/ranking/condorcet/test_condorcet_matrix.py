@@ -44,6 +44,18 @@ def test_sign():
     assert np.array_equal(sign_matrix.mx, expected)
 
 
+def test_select():
+    items = ("A", "B", "C")
+    mx = np.array([[0, 1, -2], [-1, 0, 4], [2, -4, 0]])
+    matrix = CondorcetMatrix(items, FrozenNdArray(mx))
+
+    selected = matrix.select(["C", "A"])
+    assert selected.items == ("C", "A")
+    assert np.array_equal(selected.mx, [[0, 2], [-2, 0]])
+    with pytest.raises(ValueError):
+        matrix.select(["A", "D"])
+
+
 def test_condorcet_matrix_immutability():
     items = ("A", "B", "C")
     mx = np.array([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
@@ -0,0 +1,47 @@
+import pytest
+
+from condorcet_matrices import make_matrix, make_matrix_5_cycle
+
+from ranking.condorcet.condorcet_meet_in_the_middle import CondorcetMeetInTheMiddle
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.dtypes.split import Split
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 6, 9])
+def test_matches_condorcet_optimum(n: int):
+    matrix = make_matrix(n, seed=n)
+    solver = CondorcetMeetInTheMiddle[int].of(matrix)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert solver.optimal_cost() == optimum.costs.optimal_cost()
+    assert solver.rankings() == optimum.rankings()
+
+
+def test_midpoints_5_cycle():
+    solver = CondorcetMeetInTheMiddle[str].of(make_matrix_5_cycle())
+    assert solver.optimal_cost() == 3
+    assert set(solver.midpoints()) == {
+        Split[str].of(["A", "B"], ["C", "D", "E"]),
+        Split[str].of(["B", "C"], ["D", "E", "A"]),
+        Split[str].of(["C", "D"], ["E", "A", "B"]),
+        Split[str].of(["D", "E"], ["A", "B", "C"]),
+        Split[str].of(["E", "A"], ["B", "C", "D"]),
+    }
+
+
+def test_rankings_truncated():
+    solver = CondorcetMeetInTheMiddle[str].of(make_matrix_5_cycle())
+    rankings = solver.rankings(max_num=2)
+    assert len(rankings) == 2
+    assert rankings.is_truncated
+    assert set(rankings) <= set(solver.rankings())
+    assert not solver.rankings(max_num=5).is_truncated
+
+
+def test_rankings_truncated_without_enumerating_halves():
+    # Every one of the 20! rankings is optimal; only the first ones are drawn.
+    matrix = make_matrix(20, seed=0, max_entry=0)
+    rankings = CondorcetMeetInTheMiddle[int].of(matrix).rankings(max_num=3)
+    assert rankings.is_truncated
+    assert len(rankings) == 3
+    assert len(set(rankings)) == 3
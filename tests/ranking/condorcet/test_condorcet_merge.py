@@ -0,0 +1,31 @@
+import pytest
+
+from condorcet_matrices import make_matrix, make_matrix_transitive
+
+from ranking.condorcet.condorcet_merge import merge_ranking
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import ranking_cost
+from ranking.dtypes.ranking import Ranking
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 7, 11])
+def test_cost_matches_ranking_cost(n: int):
+    matrix = make_matrix(n, seed=n)
+    costed = merge_ranking(matrix, base_size=2)
+
+    assert sorted(costed.ranking.items) == list(range(n))
+    assert costed.cost == ranking_cost(costed.ranking, matrix)
+    assert costed.cost >= CondorcetOptimum[int].of(matrix).costs.optimal_cost()
+
+
+def test_merges_transitive_matrix():
+    order = [7, 2, 9, 0, 4, 1, 8, 3, 6, 5]
+    costed = merge_ranking(make_matrix_transitive(order), base_size=1)
+    assert costed.ranking == Ranking[int].of(order)
+    assert costed.cost == 0
+
+
+def test_exact_below_base_size():
+    matrix = make_matrix(9, seed=4)
+    costed = merge_ranking(matrix, base_size=9)
+    assert costed.cost == CondorcetOptimum[int].of(matrix).costs.optimal_cost()
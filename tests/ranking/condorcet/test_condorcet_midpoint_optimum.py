@@ -0,0 +1,19 @@
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_midpoint_optimum import midpoint_optimal_ranking
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import ranking_cost
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 5, 10, 13])
+@pytest.mark.parametrize("base_size", [1, 4, 12])
+def test_matches_full_dp(n: int, base_size: int):
+    matrix = make_matrix(n, seed=n + base_size, max_entry=9)
+    result = midpoint_optimal_ranking(matrix, base_size=base_size)
+    optimum = CondorcetOptimum[int].of(matrix)
+
+    assert result.cost == optimum.costs.optimal_cost()
+    assert result.cost == ranking_cost(result.ranking, matrix)
+    assert result.ranking in set(optimum.rankings())
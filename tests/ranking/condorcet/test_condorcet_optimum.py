@@ -1,7 +1,12 @@
+import pytest
+
 from ranking.condorcet.condorcet_matrix import CondorcetMatrixBuilder
 from ranking.condorcet.condorcet_optimum import CondorcetOptimum
 from ranking.condorcet.condorcet_rankings import CondorcetRankings
 from ranking.condorcet.condorcet_splits import CondorcetSplits
+from ranking.condorcet.condorcet_utils import ranking_cost
+from ranking.dtypes.costed_ranking import CostedRanking
+from ranking.dtypes.ranking import Ranking
 
 
 def test_optimal_rankings_5_difficult():
@@ -51,6 +56,99 @@ def test_optimal_rankings_truncated():
         assert solution.is_truncated
 
 
+def test_optimal_rankings_table_free():
+    optimum = make_instance_5_cycle(table_free=True)
+    assert optimum.rankings() == make_instance_5_cycle().rankings()
+    assert optimum.splits(2) == make_instance_5_cycle().splits(2)
+
+
+def test_optimal_rankings_exact_for_large_costs():
+    builder = CondorcetMatrixBuilder[str](("A", "B", "C"))
+    builder.add_entry("A", "B", 10**7)
+    builder.add_entry("B", "C", 10**7)
+    builder.add_entry("C", "A", 10**7 + 1)
+    optimum = CondorcetOptimum[str].of(builder.build())
+
+    assert optimum.rankings() == CondorcetRankings[str].of(
+        cost=10**7, rankings=[["B", "C", "A"], ["C", "A", "B"]], is_truncated=False
+    )
+    assert isinstance(optimum.rankings().cost, int)
+
+
+def test_num_rankings():
+    assert make_instance_5_complicated().num_rankings() == 1
+    assert make_instance_5_cycle().num_rankings() == 5
+    assert make_instance_zero(6).num_rankings() == 720
+
+
+def test_kth_ranking_pages_in_enumeration_order():
+    optimum = make_instance_zero(4)
+    expected = [
+        Ranking[int].of(permutation) for permutation in optimum._rankings()
+    ]
+    assert [optimum.kth_ranking(k) for k in range(24)] == expected
+    assert set(expected) == set(optimum.rankings())
+    with pytest.raises(IndexError):
+        optimum.kth_ranking(24)
+    with pytest.raises(IndexError):
+        optimum.kth_ranking(-1)
+
+
+def test_sample_rankings():
+    optimum = make_instance_5_cycle()
+    samples = optimum.sample_rankings(20, seed=1)
+    assert len(samples) == 20
+    assert set(samples) <= set(optimum.rankings())
+    assert samples == optimum.sample_rankings(20, seed=1)
+
+
+def test_k_best():
+    optimum = make_instance_5_cycle()
+    k_best = optimum.k_best(8)
+    assert [costed.cost for costed in k_best] == [3, 3, 3, 3, 3, 4, 4, 4]
+    assert {costed.ranking for costed in k_best[:5]} == set(optimum.rankings())
+    for costed in k_best:
+        assert costed.cost == ranking_cost(costed.ranking, make_matrix_5_cycle())
+
+
+def test_rankings_within():
+    optimum = make_instance_5_complicated()
+    within = list(optimum.rankings_within(8))
+    assert [costed.cost for costed in within] == [50, 51, 58]
+    assert within[0] == CostedRanking[str].of(["C", "B", "E", "A", "D"], 50)
+    assert list(optimum.rankings_within(0)) == [within[0]]
+
+
+def test_optimal_rankings_with_precedences():
+    optimum = CondorcetOptimum[str].of(make_matrix_5_cycle(), precedences=[("B", "A")])
+    assert optimum.rankings() == CondorcetRankings[str].of(
+        cost=3.0, rankings=[("B", "C", "D", "E", "A")], is_truncated=False
+    )
+    assert optimum.kth_ranking(0) == Ranking[str].of(("B", "C", "D", "E", "A"))
+    with pytest.raises(ValueError):
+        optimum.k_best(1)
+    with pytest.raises(ValueError):
+        optimum.splits(2)
+
+
+def test_optimal_rankings_with_derived_precedences():
+    optimum = make_instance_5_complicated()
+    derived = CondorcetOptimum[str].of(
+        make_matrix_5_complicated(), derive_precedences=True
+    )
+    assert derived.costs.num_ideals < 2**5
+    assert derived.rankings() == optimum.rankings()
+    assert derived.num_rankings() == optimum.num_rankings()
+
+
+def test_precedences_reject_subset_cost_options():
+    matrix = make_matrix_5_complicated()
+    with pytest.raises(ValueError):
+        CondorcetOptimum[str].of(matrix, table_free=True, precedences=[("C", "B")])
+    with pytest.raises(ValueError):
+        CondorcetOptimum[str].of(matrix, workers=2, derive_precedences=True)
+
+
 def test_optimal_splits_5_complicated():
     optimum = make_instance_5_complicated()
 
@@ -71,6 +169,34 @@ def test_optimal_splits_5_complicated():
     )
 
 
+def test_optimal_splits_with_pinned_items():
+    optimum = make_instance_5_cycle()
+    items = ["A", "B", "C", "D", "E"]
+
+    assert optimum.splits(2, must_head=["A"], must_tail=["B", "C"]) == CondorcetSplits[
+        str
+    ].of_tails(cost=3.0, tails=[["B", "C", "D"], ["B", "C", "E"]], items=items)
+
+    splits = optimum.splits(3, must_head=["A", "E"])
+    assert splits.cost == optimum.splits(3).cost
+    assert all({"A", "E"} <= split.head for split in splits)
+
+    with pytest.raises(ValueError):
+        optimum.splits(1, must_head=["A", "B"])
+    with pytest.raises(ValueError):
+        optimum.splits(1, must_head=["F"])
+
+
+def test_all_splits():
+    optimum = make_instance_5_complicated()
+    all_splits = optimum.all_splits()
+    assert len(all_splits) == 6
+    for head_size, splits in enumerate(all_splits):
+        assert splits == optimum.splits(head_size)
+        assert all(len(split.head) == head_size for split in splits)
+    assert all_splits[0].cost == all_splits[5].cost == 0
+
+
 def test_optimal_splits_5_cycle():
     optimum = make_instance_5_cycle()
 
@@ -127,6 +253,10 @@ def test_optimal_splits_5_cycle():
 
 
 def make_instance_5_complicated():
+    return CondorcetOptimum[str].of(make_matrix_5_complicated())
+
+
+def make_matrix_5_complicated():
     builder = CondorcetMatrixBuilder[str](("A", "B", "C", "D", "E"))
     builder.add_entry("A", "B", -4)
     builder.add_entry("A", "C", 2)
@@ -138,11 +268,15 @@ def make_instance_5_complicated():
     builder.add_entry("C", "D", -16)
     builder.add_entry("C", "E", 256)
     builder.add_entry("D", "E", -64)
-    matrix = builder.build()
-    return CondorcetOptimum[str].of(matrix)
+    return builder.build()
+
+
+def make_instance_5_cycle(table_free: bool = False):
+    matrix = make_matrix_5_cycle()
+    return CondorcetOptimum[str].of(matrix, table_free=table_free)
 
 
-def make_instance_5_cycle():
+def make_matrix_5_cycle():
     builder = CondorcetMatrixBuilder[str](("A", "B", "C", "D", "E"))
     builder.add_entry("A", "B", 1)
     builder.add_entry("A", "C", 1)
@@ -154,5 +288,9 @@ def make_instance_5_cycle():
     builder.add_entry("C", "D", 1)
     builder.add_entry("C", "E", 1)
     builder.add_entry("D", "E", 1)
-    matrix = builder.build()
-    return CondorcetOptimum[str].of(matrix)
+    return builder.build()
+
+
+def make_instance_zero(n: int):
+    matrix = CondorcetMatrixBuilder[int](range(n)).build()
+    return CondorcetOptimum[int].of(matrix)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_fixed_size_splits import fixed_size_splits
+from ranking.condorcet.condorcet_matrix import CondorcetMatrix
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_split_search import CondorcetSplitSearch
+from ranking.condorcet.condorcet_utils import split_cost
+from util.nppd.frozen_nd_array import FrozenNdArray
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 9])
+def test_bounds_the_optimal_split_cost(n: int):
+    matrix = make_matrix(n, seed=n)
+    optimum = CondorcetOptimum[int].of(matrix)
+    for head_size in range(n + 1):
+        search = CondorcetSplitSearch[int].of(matrix, head_size)
+        optimal = optimum.splits(head_size)
+        assert search.lower_bound <= optimal.cost <= search.splits.cost
+        assert search.gap >= 0
+        for split in search.splits:
+            assert len(split.head) == head_size
+            assert split_cost(split, matrix) == search.splits.cost
+        if search.splits.cost == optimal.cost:
+            assert set(search.splits) <= set(optimal)
+
+
+def test_finds_optimal_split_of_ordered_items():
+    mx = np.triu(np.ones((40, 40), dtype=int), 1)
+    matrix = CondorcetMatrix[int](tuple(range(40)), FrozenNdArray(mx - mx.T))
+    search = CondorcetSplitSearch[int].of(matrix, 7, num_restarts=1)
+    assert search.splits.cost == 0
+    assert search.lower_bound == 0
+    assert [sorted(split.head) for split in search.splits] == [list(range(7))]
+
+
+def test_large_matrix():
+    matrix = make_matrix(24, seed=3)
+    search = CondorcetSplitSearch[int].of(matrix, 4, seed=1)
+    assert search.splits.cost >= fixed_size_splits(matrix, 4).cost >= search.lower_bound
+
+
+def test_head_size_out_of_range():
+    with pytest.raises(ValueError):
+        CondorcetSplitSearch[int].of(make_matrix(3, seed=0), 4)
+
+
+def test_starts_from_given_heads():
+    matrix = make_matrix(9, seed=4)
+    optimal = fixed_size_splits(matrix, 3)
+    heads = [split.head for split in optimal]
+    search = CondorcetSplitSearch[int].of(matrix, 3, num_restarts=1, heads=heads)
+    assert search.splits == optimal
+    with pytest.raises(ValueError):
+        CondorcetSplitSearch[int].of(matrix, 3, heads=[list(heads[0])[:2]])
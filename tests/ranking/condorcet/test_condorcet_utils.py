@@ -1,8 +1,17 @@
 import numpy as np
+import pytest
 
+from condorcet_matrices import make_matrix
 
 from ranking.condorcet.condorcet_matrix import CondorcetMatrix
-from ranking.condorcet.condorcet_utils import ranking_cost, split_cost
+from ranking.condorcet.condorcet_utils import (
+    dominance_precedences,
+    order_cost,
+    packed_cyclic_triangles,
+    pinned_split_masks,
+    ranking_cost,
+    split_cost,
+)
 from ranking.dtypes.ranking import Ranking
 from ranking.dtypes.split import Split
 from util.nppd.frozen_nd_array import FrozenNdArray
@@ -54,3 +63,49 @@ def test_split_violation():
 
     split = Split[str].of(("B", "C"), ("A"))
     assert split_cost(split, matrix) == 1
+
+
+def test_dominance_precedences():
+    items = ("A", "B", "C", "D")
+    mx = np.array([[0, 5, 1, 1], [-5, 0, 2, -1], [-1, -2, 0, 1], [-1, 1, -1, 0]])
+    matrix = CondorcetMatrix[str](items, FrozenNdArray(mx))
+
+    assert dominance_precedences(matrix) == {("A", "B"), ("A", "C"), ("A", "D")}
+
+
+def test_order_cost():
+    mx = np.array([[0, 1, -2], [-1, 0, 4], [2, -4, 0]])
+    violation_mx = np.maximum(0, -mx)
+
+    assert order_cost(np.array([0, 1, 2]), violation_mx) == 2
+    assert order_cost(np.array([2, 1, 0]), violation_mx) == 5
+    assert order_cost(np.array([], dtype=int), violation_mx) == 0
+
+
+def test_pinned_split_masks():
+    items = ("A", "B", "C", "D")
+
+    assert pinned_split_masks(items) == (0, 0)
+    assert pinned_split_masks(items, ["A", "C"], ["D"]) == (0b0101, 0b1000)
+    with pytest.raises(ValueError):
+        pinned_split_masks(items, ["E"])
+    with pytest.raises(ValueError):
+        pinned_split_masks(items, ["A"], ["A", "B"])
+
+
+def test_packed_cyclic_triangles():
+    # A beats B by 2, B beats C by 1 and C beats A by 3; D beats everyone.
+    mx = np.array([[0, 2, -3, -1], [-2, 0, 1, -1], [3, -1, 0, -1], [1, 1, 1, 0]])
+    triangles, weights = packed_cyclic_triangles(mx)
+    assert triangles.tolist() == [[0, 1, 2]]
+    assert weights.tolist() == [1]
+
+    triangles, weights = packed_cyclic_triangles(make_matrix(12, seed=0).mx)
+    pairs = [
+        frozenset(pair)
+        for a, b, c in triangles.tolist()
+        for pair in ((a, b), (b, c), (a, c))
+    ]
+    assert len(triangles) > 0
+    assert len(set(pairs)) == len(pairs)
+    assert (weights > 0).all()
@@ -0,0 +1,32 @@
+import pytest
+
+from condorcet_matrices import make_matrix
+
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_utils import ranking_cost
+from ranking.condorcet.condorcet_window_refinement import refine_by_windows
+from ranking.dtypes.ranking import Ranking
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 9])
+def test_single_window_is_exact(n: int):
+    matrix = make_matrix(n, seed=n)
+    reversed_ranking = Ranking[int].of(range(n - 1, -1, -1))
+    costed = refine_by_windows(matrix, reversed_ranking, window_size=12)
+    assert costed.cost == CondorcetOptimum[int].of(matrix).costs.optimal_cost()
+
+
+def test_refines_without_worsening():
+    matrix = make_matrix(40, seed=1)
+    ranking = Ranking[int].of(range(40))
+    costed = refine_by_windows(matrix, ranking, window_size=6, stride=2)
+
+    assert sorted(costed.ranking.items) == list(range(40))
+    assert costed.cost == ranking_cost(costed.ranking, matrix)
+    assert costed.cost < ranking_cost(ranking, matrix)
+    assert refine_by_windows(matrix, costed.ranking, window_size=6, stride=2) == costed
+
+
+def test_invalid_ranking():
+    with pytest.raises(ValueError):
+        refine_by_windows(make_matrix(3, seed=0), Ranking[int].of([0, 1]))
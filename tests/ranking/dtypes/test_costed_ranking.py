@@ -0,0 +1,13 @@
+from ranking.dtypes.costed_ranking import CostedRanking
+from ranking.dtypes.ranking import Ranking
+
+
+def test_constructor():
+    costed = CostedRanking[str].of(["A", "B", "C"], 3)
+    assert costed.ranking == Ranking[str].of(("A", "B", "C"))
+    assert costed.cost == 3
+
+
+def test_str():
+    costed = CostedRanking[str].of(["A", "B"], 1.5)
+    assert str(costed) == "CostedRanking(cost=1.5, ranking=(A, B))"
@@ -0,0 +1,36 @@
+from ranking.dtypes.ranking import Ranking
+from ranking.tournament.tournament import TournamentBuilder
+from ranking.tournament_greedy_ranking import greedy_tournament_ranking
+
+
+def test_greedy_tournament_ranking_transitive():
+    votes = [["a", "b", "c", "d"], ["a", "b", "d"]]
+    tournament = TournamentBuilder[str]().add_paths(votes).build()
+    result = greedy_tournament_ranking(tournament)
+    assert result.ranking == Ranking[str].of(["a", "b", "c", "d"])
+    assert result.violated_edges == ()
+
+
+def test_greedy_tournament_ranking_cycle():
+    votes = [
+        ["a", "b", "c", "d", "e"],
+        ["a", "c", "d", "b", "e"],
+        ["a", "d", "b", "c", "e"],
+        ["b", "a"],
+        ["c", "e"],
+    ]
+    tournament = TournamentBuilder[str]().add_paths(votes).build()
+    result = greedy_tournament_ranking(tournament)
+    assert result.ranking.items[0] == "a"
+    assert result.ranking.items[-1] == "e"
+    assert len(result.violated_edges) == 1
+    (winner, loser), = result.violated_edges
+    items = result.ranking.items
+    assert items.index(loser) < items.index(winner)
+
+
+def test_greedy_tournament_ranking_draws_ranked_last():
+    votes = [["a", "b"], ["b", "a"], ["c", "d"]]
+    tournament = TournamentBuilder[str]().add_paths(votes).build()
+    result = greedy_tournament_ranking(tournament)
+    assert result.ranking == Ranking[str].of(["c", "d", "a", "b"])
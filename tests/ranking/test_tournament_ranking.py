@@ -1,5 +1,13 @@
+import random
+
+import pytest
+
 import ranking.tournament_ranking as tr
+from ranking.condorcet.condorcet_optimum import CondorcetOptimum
+from ranking.condorcet.condorcet_splits import CondorcetSplits
+from ranking.condorcet.condorcet_utils import split_cost
 from ranking.dtypes.ranking import Ranking
+from ranking.dtypes.split import Split
 from ranking.tournament.tournament import TournamentBuilder
 
 
@@ -37,3 +45,90 @@ def test_tournament_ranking_with_tiebreaker():
     assert set(ranking.segments[0]) == {Ranking[str].of(["a"])}
     assert set(ranking.segments[1]) == {Ranking[str].of(["b", "c", "d"])}
     assert set(ranking.segments[2]) == {Ranking[str].of(["e"])}
+
+
+def test_tournament_splits():
+    votes = [
+        ["a", "b", "c", "d", "e"],
+        ["a", "c", "d", "b", "e"],
+        ["a", "d", "b", "c", "e"],
+        ["b", "a"],
+        ["c", "e"],
+    ]
+    tournament = TournamentBuilder[str]().add_paths(votes).build()
+    optimum = CondorcetOptimum[str].of(tr._make_condorcet_matrix(tournament))
+    for head_size in range(6):
+        assert tr.tournament_splits(tournament, head_size).splits == optimum.splits(head_size)
+
+    search = tr.tournament_splits(tournament, 1)
+    assert search.splits == CondorcetSplits[str](0, frozenset([Split[str].of(["a"], ["b", "c", "d", "e"])]))
+    assert search.lower_bound == 0
+    assert isinstance(search.splits.cost, int)
+
+
+def test_tournament_splits_disconnected_groups():
+    # A cycle a > b > c > a, and separately d > e.
+    paths = [["a", "b", "c"], ["b", "c", "a"], ["c", "a", "b"], ["a", "b"], ["b", "c"], ["c", "a"], ["d", "e"]]
+    tournament = TournamentBuilder[str]().add_paths(paths).build()
+    optimum = CondorcetOptimum[str].of(tr._make_condorcet_matrix(tournament))
+    for head_size in range(6):
+        assert tr.tournament_splits(tournament, head_size).splits == optimum.splits(head_size)
+
+    splits = tr.tournament_splits(tournament, 2).splits
+    assert splits == CondorcetSplits[str](0, frozenset([Split[str].of(["d", "e"], ["a", "b", "c"])]))
+
+
+def test_tournament_splits_unordered_components():
+    # a beats b, c and d, which did not meet each other; e beats f and g, which tie.
+    paths = [["a", "b"], ["a", "c"], ["a", "d"], ["e", "f"], ["e", "g"]]
+    tournament = TournamentBuilder[str]().add_paths(paths).add_paths([["f", "g"], ["g", "f"]]).build()
+    optimum = CondorcetOptimum[str].of(tr._make_condorcet_matrix(tournament))
+    for head_size in range(8):
+        assert tr.tournament_splits(tournament, head_size).splits == optimum.splits(head_size)
+
+
+def test_tournament_splits_max_num():
+    # Five unrelated pairs, each won by its a: the heads that hold each b with its a cost nothing.
+    paths = [[f"a{idx}", f"b{idx}"] for idx in range(5)]
+    tournament = TournamentBuilder[str]().add_paths(paths).build()
+    assert len(tr.tournament_splits(tournament, 5).splits) == 51
+    splits = tr.tournament_splits(tournament, 5, max_num=3).splits
+    assert splits.cost == 0
+    assert len(splits) == 3
+    assert splits.splits <= tr.tournament_splits(tournament, 5).splits.splits
+
+
+def test_tournament_splits_ahead_of_own_component():
+    # a, b and c beat each other in a cycle by 10; x lost to a by 1. Cutting the cycle costs 10, while putting x
+    # ahead of it costs 1.
+    paths = [["a", "b"]] * 10 + [["b", "c"]] * 10 + [["c", "a"]] * 10 + [["a", "x"]]
+    tournament = TournamentBuilder[str]().add_paths(paths).build()
+    search = tr.tournament_splits(tournament, 1)
+    assert search.splits == CondorcetSplits[str](1, frozenset([Split[str].of(["x"], ["a", "b", "c"])]))
+    assert 0 <= search.lower_bound <= 1
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_tournament_splits_random(seed: int):
+    rng = random.Random(seed)
+    sides = [f"s{idx}" for idx in range(rng.randint(2, 9))]
+    paths = [rng.sample(sides, 2) for _ in range(rng.randint(1, 3 * len(sides)))]
+    tournament = TournamentBuilder[str]().add_paths(paths).build()
+    matrix = tr._make_condorcet_matrix(tournament)
+    optimum = CondorcetOptimum[str].of(matrix)
+    for head_size in range(len(tournament.sides) + 1):
+        search = tr.tournament_splits(tournament, head_size)
+        optimal = optimum.splits(head_size)
+        assert search.lower_bound <= optimal.cost <= search.splits.cost
+        for split in search.splits:
+            assert split_cost(split, matrix) == search.splits.cost
+        if search.lower_bound == search.splits.cost == 0:
+            assert search.splits == optimal
+        elif search.splits.cost == optimal.cost:
+            assert set(search.splits) <= set(optimal)
+
+
+def test_tournament_splits_head_size_out_of_range():
+    tournament = TournamentBuilder[str]().add_paths([["a", "b"]]).build()
+    with pytest.raises(ValueError):
+        tr.tournament_splits(tournament, 3)
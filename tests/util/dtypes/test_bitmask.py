@@ -1,7 +1,17 @@
 from typing import List
+import numpy as np
 import pytest
 
-from src.util.dtypes.bitmask import iter_bits
+from src.util.dtypes.bitmask import (
+    binomials,
+    combination_ranks,
+    combinations_of,
+    deposit_bits,
+    drop_bit,
+    iter_bits,
+    popcount_layers,
+    popcounts,
+)
 
 
 @pytest.mark.parametrize(
@@ -19,4 +29,80 @@ from src.util.dtypes.bitmask import iter_bits
     ]
 )
 def test_iter_bits(mask: int, expected: List[int]):
-    assert list(iter_bits(mask)) == expected
\ No newline at end of file
+    assert list(iter_bits(mask)) == expected
+
+@pytest.mark.parametrize(
+    "mask,bit,expected",
+    [
+        (0, 0, 0),
+        (1, 0, 0),
+        (0b1010, 0, 0b101),
+        (0b1011, 1, 0b101),
+        (0b1101, 2, 0b101),
+        (0b0111, 3, 0b111),
+    ]
+)
+def test_drop_bit(mask: int, bit: int, expected: int):
+    assert drop_bit(mask, bit) == expected
+
+
+def test_drop_bit_array():
+    masks = np.array([0b1010, 0b1011, 0b1110])
+    assert np.array_equal(drop_bit(masks, 1), [0b100, 0b101, 0b110])
+
+
+def test_popcounts():
+    assert np.array_equal(popcounts(0), [0])
+    assert np.array_equal(popcounts(3), [0, 1, 1, 2, 1, 2, 2, 3])
+    assert np.array_equal(popcounts(10), [bin(m).count("1") for m in range(1024)])
+
+
+def test_popcount_layers():
+    layers = popcount_layers(4)
+    assert len(layers) == 5
+    assert [list(layer) for layer in layers] == [
+        [0],
+        [1, 2, 4, 8],
+        [3, 5, 6, 9, 10, 12],
+        [7, 11, 13, 14],
+        [15],
+    ]
+
+
+def test_binomials():
+    table = binomials(5)
+    assert table.shape == (6, 7)
+    assert table[5, 2] == 10
+    assert table[4, 4] == 1
+    assert table[3, 4] == 0
+
+
+@pytest.mark.parametrize("num_bits,num_set", [(0, 0), (4, 0), (4, 2), (6, 3), (6, 6)])
+def test_combinations_of(num_bits: int, num_set: int):
+    expected = [m for m in range(1 << num_bits) if bin(m).count("1") == num_set]
+    masks = combinations_of(num_bits, num_set)
+    assert list(masks) == expected
+    assert list(combination_ranks(masks, num_bits)) == list(range(len(expected)))
+
+
+def test_combinations_of_in_chunks():
+    masks = combinations_of(7, 3)
+    chunks = [combinations_of(7, 3, start, start + 4) for start in range(0, 40, 4)]
+    assert list(np.concatenate(chunks)) == list(masks)
+    assert list(combinations_of(7, 3, 30)) == list(masks[30:])
+    assert len(combinations_of(7, 3, 50, 60)) == 0
+
+
+def test_deposit_bits():
+    masks = combinations_of(3, 2)
+    assert list(deposit_bits(masks, [1, 4, 5])) == [0b010010, 0b100010, 0b110000]
+    assert list(deposit_bits(np.array([0b11]), [])) == [0]
+
+
+def test_combination_ranks():
+    assert list(combination_ranks(np.array([0b0011, 0b0101, 0b0110, 0b1001]), 4)) == [
+        0,
+        1,
+        2,
+        3,
+    ]
@@ -0,0 +1,55 @@
+from typing import Sequence, Tuple
+
+from util.graphs.digraph import DiGraph
+from util.graphs.greedy_fas import GreedyFas
+
+
+def test_greedy_fas_on_acyclic_graph():
+    # a -> b -> c, a -> c, d -> c
+    digraph = make_digraph([("a", "b"), ("b", "c"), ("a", "c"), ("d", "c")])
+    fas = GreedyFas[str].of(digraph)
+    assert fas.back_edges == ()
+    assert_order_integrity(fas, digraph)
+
+
+def test_greedy_fas_on_cycle():
+    # a -> b -> c -> a
+    digraph = make_digraph([("a", "b"), ("b", "c"), ("c", "a")])
+    fas = GreedyFas[str].of(digraph)
+    assert len(fas.back_edges) == 1
+    assert_order_integrity(fas, digraph)
+
+
+def test_greedy_fas_prefers_largest_surplus():
+    # a points to b, c and d, d points back to a, and b -> c -> d -> b is a cycle.
+    edges = [("a", "b"), ("a", "c"), ("a", "d"), ("b", "c"), ("c", "d"), ("d", "b")]
+    edges.append(("d", "a"))
+    digraph = make_digraph(edges)
+    fas = GreedyFas[str].of(digraph)
+    assert fas.order[0] == "a"
+    assert len(fas.back_edges) == 2
+    assert_order_integrity(fas, digraph)
+
+
+def test_greedy_fas_on_empty_graph():
+    fas = GreedyFas[str].of(DiGraph[str].builder().build())
+    assert fas.order == ()
+    assert fas.back_edges == ()
+
+
+def make_digraph(edges: Sequence[Tuple[str, str]]) -> DiGraph[str]:
+    builder = DiGraph[str].builder()
+    for source, sink in edges:
+        builder.add_edge(source, sink)
+    return builder.build()
+
+
+def assert_order_integrity(fas: GreedyFas[str], digraph: DiGraph[str]) -> None:
+    assert sorted(fas.order) == sorted(digraph.nodes())
+    position = {node: idx for idx, node in enumerate(fas.order)}
+    assert set(fas.back_edges) == {
+        (source, sink)
+        for source in digraph.nodes()
+        for sink in digraph.neighbours(source)
+        if position[sink] < position[source]
+    }
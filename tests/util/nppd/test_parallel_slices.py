@@ -0,0 +1,36 @@
+import threading
+
+import numpy as np
+import pytest
+
+from util.nppd.parallel_slices import for_each_slice
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3, 8])
+@pytest.mark.parametrize("length", [0, 1, 7, 100])
+def test_slices_cover_range(workers: int, length: int):
+    hits = np.zeros(length, dtype=int)
+
+    def fn(slc: slice) -> None:
+        hits[slc] += 1
+
+    for_each_slice(fn, length, workers)
+    assert np.all(hits == 1)
+
+
+def test_min_slice_runs_inline():
+    threads = set()
+
+    def fn(slc: slice) -> None:
+        threads.add(threading.get_ident())
+
+    for_each_slice(fn, 10, workers=4, min_slice=100)
+    assert threads == {threading.get_ident()}
+
+
+def test_exceptions_propagate():
+    def fn(slc: slice) -> None:
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        for_each_slice(fn, 100, workers=4)